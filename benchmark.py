@@ -0,0 +1,198 @@
+"""
+benchmark.py - Benchmarks do protocolo de tutoria a escalas crescentes.
+
+Cada cenário (estudantes × tutores × peers) corre sem interface num processo
+próprio, no LocalBus e por omissão com relógio virtual, com o output dos
+agentes descartado. Um LocalBus instrumentado regista as mensagens e mede:
+
+* CFP → propose/refuse e accept → inform (segundos de simulação);
+* mensagens por segundo (de simulação e de relógio real);
+* recusas por lição;
+* pico de RSS e tempo de CPU do processo, também por agente.
+
+Os resultados vão para um ficheiro JSON com o commit atual, para comparar
+execuções entre commits.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from colorama import Fore, Style
+from transport import LocalBus
+from tracing import percentiles, tracer
+import logs
+import clock
+
+
+class InstrumentedBus(LocalBus):
+    """LocalBus que guarda contagens e latências do protocolo por conversa (thread)."""
+
+    def __init__(self):
+        super().__init__()
+        self.performatives = Counter()
+        self._pending = {}  # (performative, thread, jid) -> instante de envio
+        self.cfp_latencies = []
+        self.lesson_latencies = []
+
+    async def send(self, msg, behaviour):
+        now = clock.time()
+        perf = msg.get_metadata("performative")
+        self.performatives[perf] += 1
+        sender, to = str(msg.sender.bare) if msg.sender else None, str(msg.to.bare)
+        if perf in ("cfp", "accept-proposal"):
+            self._pending[(perf, msg.thread, to)] = now
+        elif perf in ("propose", "refuse"):
+            sent = self._pending.pop(("cfp", msg.thread, sender), None)
+            if sent is not None:
+                self.cfp_latencies.append(now - sent)
+        elif perf == "inform":
+            sent = self._pending.pop(("accept-proposal", msg.thread, sender), None)
+            if sent is not None:
+                self.lesson_latencies.append(now - sent)
+        await super().send(msg, behaviour)
+
+
+async def _run_scenario(scenario):
+    from lifecycle import lifecycle
+    from main import create_agents, run_agents
+    from metrics import get_metrics_logger, set_default_metrics
+
+    set_default_metrics(scenario["metrics"], "csv")
+    if scenario["virtual_time"]:
+        clock.set_clock(clock.VirtualClock())
+    lifecycle.reset()
+    tracer.reset()
+    # O output dos agentes é descartado: nem chega a ser formatado
+    logs.setup(level="WARNING")
+    bus = InstrumentedBus()
+
+    # Linha de base (imports, interpretador) descontada nos valores por agente
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    agents = create_agents(scenario["students"], scenario["tutors"], scenario["peers"])
+    wall0, sim0 = time.perf_counter(), clock.time()
+    await run_agents(agents, bus=bus, duration=scenario["duration"])
+    wall, sim = time.perf_counter() - wall0, clock.time() - sim0
+    get_metrics_logger().close()
+    logs.shutdown()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (usage.ru_utime + usage.ru_stime) - (before.ru_utime + before.ru_stime)
+    messages = sum(bus.performatives.values())
+    lessons = bus.performatives["inform"]
+    students = [a for name, a in agents.items() if name.startswith("student")]
+    return {
+        **{key: scenario[key] for key in ("name", "students", "tutors", "peers", "duration", "virtual_time")},
+        "agents": len(agents),
+        "wall_time": wall,
+        "sim_time": sim,
+        "messages": messages,
+        "performatives": dict(bus.performatives),
+        "msgs_per_sim_s": messages / sim if sim else 0.0,
+        "msgs_per_wall_s": messages / wall if wall else 0.0,
+        "cfp_to_propose": percentiles(bus.cfp_latencies),
+        "accept_to_inform": percentiles(bus.lesson_latencies),
+        # Etapas de cada pedido de ajuda, vistas pelo estudante
+        "stages": tracer.summary("all").get("all", {}),
+        "lessons": lessons,
+        "refusals_per_lesson": bus.performatives["refuse"] / lessons if lessons else None,
+        "progress_gain": sum(a.knowledge.progress - a.initial_progress for a in students) / max(1, len(students)),
+        # Linux: ru_maxrss em KiB
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "baseline_rss_mb": before.ru_maxrss / 1024,
+        "cpu_s": cpu,
+        "cpu_ms_per_agent": 1000 * cpu / len(agents),
+        "rss_kb_per_agent": (usage.ru_maxrss - before.ru_maxrss) / len(agents),
+    }
+
+
+def run_scenario(scenario):
+    """Corre um cenário (num processo novo, para RSS/CPU só deste cenário)."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return asyncio.run(_run_scenario(scenario))
+
+
+def scenarios(students, tutors, peers, grid=False, duration=60, virtual_time=True, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="isia-bench-")
+    if grid:
+        combos = [(s, t) for s in students for t in tutors]
+    else:
+        combos = list(zip(students, tutors))
+    result = []
+    for i, (s, t) in enumerate(combos):
+        p = peers[min(i, len(peers) - 1)]
+        result.append({
+            "name": f"{s}s-{t}t-{p}p",
+            "students": s,
+            "tutors": t,
+            "peers": p,
+            "duration": duration,
+            "virtual_time": virtual_time,
+            "metrics": os.path.join(workdir, f"metrics-{s}s-{t}t-{p}p.csv"),
+        })
+    return result
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scenario_list, out="benchmark.json"):
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for scenario in scenario_list:
+        print(Fore.CYAN + f"[Benchmark] {scenario['name']}..." + Style.RESET_ALL)
+        # Um processo por cenário: o pico de RSS e o CPU não se acumulam entre cenários
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            r = pool.submit(run_scenario, scenario).result()
+        results.append(r)
+        cfp, lesson = r["cfp_to_propose"], r["accept_to_inform"]
+        print(f"    {r['messages']} msgs em {r['wall_time']:.1f}s ({r['msgs_per_wall_s']:.0f} msg/s reais, "
+              f"{r['msgs_per_sim_s']:.1f} msg/s simulados) | CFP→propose p95={cfp.get('p95', 0):.3f}s "
+              f"accept→inform p95={lesson.get('p95', 0):.3f}s | recusas/lição={r['refusals_per_lesson']} | "
+              f"RSS={r['peak_rss_mb']:.0f}MB CPU={r['cpu_ms_per_agent']:.1f}ms/agente")
+
+    report = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "scenarios": results,
+    }
+    with open(out, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(Fore.GREEN + f"[Benchmark] resultados em {out}" + Style.RESET_ALL)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do protocolo de tutoria")
+    parser.add_argument("--students", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--tutors", type=int, nargs="+", default=[3, 30, 300])
+    parser.add_argument("--peers", type=int, nargs="+", default=[1, 4, 10])
+    parser.add_argument("--grid", action="store_true", help="todas as combinações estudantes × tutores")
+    parser.add_argument("--duration", type=float, default=60, help="segundos (simulados) por cenário")
+    parser.add_argument("--real-time", action="store_true", help="usar o relógio real em vez do virtual")
+    parser.add_argument("--out", default="benchmark.json")
+    args = parser.parse_args()
+
+    scenario_list = scenarios(args.students, args.tutors, args.peers, grid=args.grid,
+                              duration=args.duration, virtual_time=not args.real_time)
+    run_benchmarks(scenario_list, args.out)
+
+
+if __name__ == "__main__":
+    main()
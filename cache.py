@@ -0,0 +1,71 @@
+"""
+cache.py - Cache LRU com TTL para as recomendações do Resource Manager.
+
+As entradas expiram ao fim de `ttl` segundos (no relógio da simulação) e a
+menos usada sai quando se excede `maxsize`. A cache guarda a versão do
+catálogo a que as entradas se referem: quando a versão muda, tudo é
+invalidado.
+"""
+from collections import OrderedDict
+import clock
+
+
+class RecommendationCache:
+    def __init__(self, maxsize=1024, ttl=300.0, version=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = version
+        self._entries = OrderedDict()  # chave -> (valor, expira_em)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, version=None):
+        """Valor em cache ou None. `version` diferente da atual invalida a cache."""
+        if version is not None and version != self.version:
+            self.invalidate(version)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires = entry
+        if clock.time() >= expires:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (value, clock.time() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, version=None):
+        """Esvazia a cache (ex.: o catálogo mudou) e passa a `version`, se dada."""
+        self._entries.clear()
+        self.invalidations += 1
+        if version is not None:
+            self.version = version
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "version": self.version,
+        }
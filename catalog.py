@@ -0,0 +1,162 @@
+"""
+catalog.py - Catálogo de recursos de estudo com índice invertido.
+
+Os recursos (tópico, estilo, dificuldade, duração) vêm de um ficheiro JSON
+(lista de objetos) ou SQLite (tabela `resources`). O índice agrupa-os por
+(tópico, estilo), ordenados por dificuldade, e `top_k` encontra com bisect os
+k recursos de dificuldade mais próxima do conhecimento do estudante.
+
+O índice é guardado ao lado do ficheiro (`<ficheiro>.idx`, pickle) com a
+impressão digital da fonte (tamanho + mtime); se a fonte não mudou, o
+arranque carrega-o em vez de o reconstruir.
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import sqlite3
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+INDEX_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Resource:
+    id: int
+    title: str
+    topic: str
+    style: str
+    difficulty: float
+    duration: float  # minutos
+
+
+class ResourceCatalog:
+    def __init__(self, resources=()):
+        self.index = {}  # (tópico, estilo) -> ([dificuldades], [recursos]) ordenados
+        self.fingerprint = None
+        self._build(resources)
+
+    def _build(self, resources):
+        groups = {}
+        for resource in resources:
+            groups.setdefault((resource.topic, resource.style), []).append(resource)
+        self.index = {}
+        for key, group in groups.items():
+            group.sort(key=lambda r: (r.difficulty, r.id))
+            self.index[key] = ([r.difficulty for r in group], group)
+
+    def __len__(self):
+        return sum(len(group) for _, group in self.index.values())
+
+    @property
+    def version(self):
+        """Muda sempre que o catálogo é recarregado de uma fonte diferente."""
+        return self.fingerprint
+
+    def top_k(self, topic, style, knowledge, k=3, min_difficulty=0.0, max_difficulty=1.0):
+        """Os k recursos de (tópico, estilo) com dificuldade mais próxima de `knowledge`."""
+        entry = self.index.get((topic, style))
+        if entry is None:
+            return []
+        difficulties, resources = entry
+        lo = bisect_left(difficulties, min_difficulty)
+        hi = bisect_right(difficulties, max_difficulty)
+        # Expandir para os dois lados a partir da posição do conhecimento
+        right = min(max(bisect_left(difficulties, knowledge, lo, hi), lo), hi)
+        left = right - 1
+        chosen = []
+        while len(chosen) < k and (left >= lo or right < hi):
+            if right >= hi or (left >= lo and knowledge - difficulties[left] <= difficulties[right] - knowledge):
+                chosen.append(resources[left])
+                left -= 1
+            else:
+                chosen.append(resources[right])
+                right += 1
+        return chosen
+
+    # ---------- carregamento ----------
+    @classmethod
+    def load(cls, path):
+        """Carrega o catálogo de `path` (.json ou SQLite), usando o índice persistido se válido."""
+        fingerprint = _fingerprint(path)
+        index_path = path + ".idx"
+        try:
+            with open(index_path, "rb") as file:
+                saved = pickle.load(file)
+            if saved["version"] == INDEX_VERSION and saved["fingerprint"] == fingerprint:
+                catalog = cls()
+                catalog.index = saved["index"]
+                catalog.fingerprint = fingerprint
+                return catalog
+        except (OSError, EOFError, KeyError, TypeError, ValueError, AttributeError, ImportError,
+                pickle.UnpicklingError):
+            # Índice ilegível ou com outro formato: reconstruir a partir da fonte
+            pass
+
+        catalog = cls(_read_resources(path))
+        catalog.fingerprint = fingerprint
+        catalog.save_index(index_path)
+        return catalog
+
+    def save_index(self, index_path):
+        tmp = index_path + ".tmp"
+        with open(tmp, "wb") as file:
+            pickle.dump({"version": INDEX_VERSION, "fingerprint": self.fingerprint, "index": self.index}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, index_path)
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _read_resources(path):
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            rows = json.load(file)
+    else:
+        with sqlite3.connect(path) as db:
+            db.row_factory = sqlite3.Row
+            rows = [dict(row) for row in db.execute("SELECT id, title, topic, style, difficulty, duration FROM resources")]
+    return [
+        Resource(int(row["id"]), row["title"], row["topic"], row["style"], float(row["difficulty"]), float(row["duration"]))
+        for row in rows
+    ]
+
+
+def generate(path, count, topics, styles, seed=None):
+    """Gera um catálogo sintético em JSON (para testes e benchmarks)."""
+    rng = random.Random(seed)
+    kinds = ["Video", "Exercise", "Article", "Quiz", "Project"]
+    rows = []
+    for i in range(1, count + 1):
+        topic, style = rng.choice(topics), rng.choice(styles)
+        difficulty = round(rng.random(), 3)
+        rows.append({
+            "id": i,
+            "title": f"{rng.choice(kinds)} {style} #{i} on {topic} (difficulty {difficulty})",
+            "topic": topic,
+            "style": style,
+            "difficulty": difficulty,
+            "duration": rng.choice([5, 10, 15, 30, 45, 60]),
+        })
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(rows, file, ensure_ascii=False)
+
+
+def main():
+    from main import DISCIPLINES
+    from resource_manager import STYLE_MAP
+    parser = argparse.ArgumentParser(description="Gerar um catálogo de recursos sintético")
+    parser.add_argument("path")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    generate(args.path, args.count, DISCIPLINES, sorted(set(STYLE_MAP.values())), seed=args.seed)
+    print(f"{args.count} recursos gravados em {args.path}")
+
+
+if __name__ == "__main__":
+    main()
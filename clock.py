@@ -0,0 +1,108 @@
+"""
+clock.py - Relógio da simulação.
+
+Por omissão os agentes usam o relógio real (`asyncio.sleep`, `time.time`).
+Com `set_clock(VirtualClock())` os atrasos da simulação passam a ser eventos
+num relógio virtual, que salta diretamente para o próximo evento sempre que
+todos os agentes estão parados à espera. Faz sentido sobretudo com o LocalBus
+(transport.py): com XMPP as mensagens em trânsito não são visíveis ao relógio.
+"""
+import asyncio
+import heapq
+import itertools
+import time as _time
+from datetime import datetime
+
+
+class RealClock:
+    """Relógio de parede (comportamento original)."""
+
+    def time(self):
+        return _time.time()
+
+    def now(self):
+        return datetime.now()
+
+    async def sleep(self, delay):
+        await asyncio.sleep(delay)
+
+
+class VirtualClock:
+    """Relógio de eventos discretos: o tempo só avança quando o loop está ocioso."""
+
+    def __init__(self, start=None, settle_rounds=3, max_rounds=1000):
+        self._now = _time.time() if start is None else start
+        self._timers = []  # heap de (instante, seq, future)
+        self._seq = itertools.count()
+        self._driver = None
+        # Nº de voltas do loop sem trabalho pendente para considerar ocioso
+        self.settle_rounds = settle_rounds
+        # Limite de voltas: behaviours em espera ativa não podem parar o relógio
+        self.max_rounds = max_rounds
+
+    def time(self):
+        return self._now
+
+    def now(self):
+        return datetime.fromtimestamp(self._now)
+
+    async def sleep(self, delay):
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._timers, (self._now + delay, next(self._seq), fut))
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.create_task(self._drive())
+        await fut
+
+    async def _wait_idle(self):
+        loop = asyncio.get_running_loop()
+        ready = getattr(loop, "_ready", None)  # indisponível em uvloop
+        quiet = 0
+        for _ in range(self.max_rounds):
+            await asyncio.sleep(0)
+            if ready is not None and len(ready) > 0:
+                quiet = 0
+            else:
+                quiet += 1
+            if quiet >= self.settle_rounds:
+                return
+
+    async def _drive(self):
+        while self._timers:
+            await self._wait_idle()
+            # Descartar sleeps cancelados (ex.: behaviour morto)
+            while self._timers and self._timers[0][2].done():
+                heapq.heappop(self._timers)
+            if not self._timers:
+                break
+            self._now = max(self._now, self._timers[0][0])
+            while self._timers and self._timers[0][0] <= self._now:
+                _, _, fut = heapq.heappop(self._timers)
+                if not fut.done():
+                    fut.set_result(None)
+
+
+_clock = RealClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(new_clock):
+    global _clock
+    _clock = new_clock
+
+
+def time():
+    return _clock.time()
+
+
+def now():
+    return _clock.now()
+
+
+async def sleep(delay):
+    await _clock.sleep(delay)
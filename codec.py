@@ -0,0 +1,140 @@
+"""
+codec.py - Codificação dos corpos das mensagens trocadas entre agentes.
+
+Cada tipo de corpo é uma dataclass com campos tipados. No fio usa-se JSON
+compacto com versão ({"v":1,...}). Durante a migração `decode` continua a
+aceitar o formato antigo "chave:valor;chave:valor", e `set_wire_format("legacy")`
+volta a emiti-lo para falar com agentes ainda não migrados.
+"""
+import json
+from dataclasses import dataclass, fields, asdict
+
+VERSION = 1
+
+_wire_format = "json"
+
+
+class CodecError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class HelpRequest:
+    """Corpo de "cfp" e "resource-request"."""
+    topic: str
+    progress: float
+    style: str
+    knowledge: float = None  # conhecimento no tópico (opcional)
+
+
+@dataclass(frozen=True)
+class Proposal:
+    """Corpo de "propose"."""
+    discipline: str
+    expertise: float
+    slots: int
+    available_in: int = 1
+
+
+@dataclass(frozen=True)
+class Refusal:
+    """Corpo de "refuse"."""
+    reason: str = ""
+
+
+@dataclass(frozen=True)
+class Explanation:
+    """Corpo de "inform" (tutor ou peer)."""
+    explanation: str = ""
+
+
+@dataclass(frozen=True)
+class ResourceRecommendation:
+    """Corpo de "resource-recommendation"."""
+    resource: str
+
+
+# Nomes antigos de campos no formato texto
+_LEGACY_ALIASES = {"explicacao": "explanation"}
+
+
+def set_wire_format(wire_format):
+    global _wire_format
+    if wire_format not in ("json", "legacy"):
+        raise ValueError(f"Formato desconhecido: {wire_format}")
+    _wire_format = wire_format
+
+
+def encode(body):
+    # Campos opcionais vazios não vão para o fio
+    values = {key: value for key, value in asdict(body).items() if value is not None}
+    if _wire_format == "legacy":
+        return ";".join(f"{key}:{value}" for key, value in values.items())
+    values["v"] = VERSION
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode(text, cls):
+    """Converte o corpo de uma mensagem numa instância de `cls`, validando os tipos."""
+    # Mensagens sem corpo (msg.body is None) também são corpos inválidos
+    if not isinstance(text, str):
+        raise CodecError(f"Corpo em falta ou não textual: {text!r}")
+    if text.startswith("{"):
+        try:
+            raw = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise CodecError(f"JSON inválido: {e}") from None
+        if not isinstance(raw, dict):
+            raise CodecError("O corpo tem de ser um objeto JSON")
+        version = raw.pop("v", None)
+        if version != VERSION:
+            raise CodecError(f"Versão não suportada: {version}")
+    else:
+        raw = _parse_legacy(text)
+
+    values = {}
+    for field in fields(cls):
+        if field.name not in raw:
+            continue
+        # Campos opcionais (default None) aceitam null
+        if raw[field.name] is None and field.default is None:
+            continue
+        values[field.name] = _convert(field.name, raw[field.name], field.type, strict=text.startswith("{"))
+    try:
+        return cls(**values)
+    except TypeError as e:
+        raise CodecError(f"{cls.__name__}: {e}") from None
+
+
+def _parse_legacy(text):
+    raw = {}
+    for part in text.split(";"):
+        key, sep, value = part.partition(":")
+        if not sep:
+            continue
+        key = key.strip()
+        raw[_LEGACY_ALIASES.get(key, key)] = value
+    return raw
+
+
+def _convert(name, value, kind, strict):
+    # bool é subclasse de int: nunca é aceite como número
+    if isinstance(value, bool):
+        raise CodecError(f"Campo '{name}': valor booleano inesperado")
+    # Em JSON os números têm de vir como números; no formato antigo tudo é texto
+    if strict and kind in (int, float) and not isinstance(value, (int, float)):
+        raise CodecError(f"Campo '{name}': esperado {kind.__name__}, recebido {value!r}")
+    try:
+        if kind is float:
+            return float(value)
+        if kind is int:
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError(value)
+            return int(value)
+        if kind is str:
+            if not isinstance(value, str):
+                raise ValueError(value)
+            return value
+    except (TypeError, ValueError):
+        raise CodecError(f"Campo '{name}': esperado {kind.__name__}, recebido {value!r}") from None
+    raise CodecError(f"Campo '{name}': tipo {kind} não suportado")
@@ -0,0 +1,64 @@
+"""
+conversation.py - Recolha de propostas por conversa (thread) no protocolo CFP.
+"""
+import asyncio
+import clock
+
+
+class ProposalCollector:
+    """
+    Junta as respostas (propose/refuse) aos CFP de uma conversa.
+    `wait()` termina assim que todos os tutores contactados respondem ou
+    quando passa o prazo, o que acontecer primeiro.
+    """
+
+    def __init__(self, thread, expected):
+        self.thread = thread
+        self.expected = set(str(t) for t in expected)
+        self.proposals = []
+        self.refused = set()
+        self._replied = set()
+        self._complete = asyncio.Event()
+        if not self.expected:
+            self._complete.set()
+
+    @property
+    def missing(self):
+        """Tutores contactados que ainda não responderam."""
+        return self.expected - self._replied
+
+    def matches(self, msg):
+        # Mensagens sem thread (formato antigo) contam para a conversa atual
+        return msg.thread is None or msg.thread == self.thread
+
+    def _reply(self, tutor):
+        if tutor in self._replied:
+            return False
+        self._replied.add(tutor)
+        if not self.missing:
+            self._complete.set()
+        return True
+
+    def add_proposal(self, tutor, proposal):
+        tutor = str(tutor)
+        if not self._reply(tutor):
+            return False
+        self.proposals.append(proposal)
+        return True
+
+    def add_refusal(self, tutor):
+        tutor = str(tutor)
+        if not self._reply(tutor):
+            return False
+        self.refused.add(tutor)
+        return True
+
+    async def wait(self, deadline):
+        """Espera pelas respostas; devolve o nº de respostas em falta."""
+        if not self._complete.is_set():
+            complete = asyncio.create_task(self._complete.wait())
+            timer = asyncio.create_task(clock.sleep(deadline))
+            await asyncio.wait([complete, timer], return_when=asyncio.FIRST_COMPLETED)
+            complete.cancel()
+            timer.cancel()
+        return len(self.missing)
@@ -0,0 +1,74 @@
+"""
+directory.py - Diretório de tutores (páginas amarelas).
+
+Os tutores registam-se com a disciplina, a expertise e as vagas livres e
+atualizam as vagas sempre que estas mudam. Os estudantes pedem os k melhores
+candidatos para um tópico em vez de enviar CFP a todos os contactos "tutor*".
+"""
+import bisect
+import heapq
+
+
+class TutorEntry:
+    __slots__ = ("jid", "discipline", "expertise", "slots")
+
+    def __init__(self, jid, discipline, expertise, slots):
+        self.jid = jid
+        self.discipline = discipline
+        self.expertise = expertise
+        self.slots = slots
+
+    def __repr__(self):
+        return f"TutorEntry({self.jid}, {self.discipline}, exp={self.expertise:.2f}, slots={self.slots})"
+
+
+class TutorDirectory:
+    def __init__(self):
+        self.entries = {}  # jid -> TutorEntry
+        # disciplina -> lista ordenada por expertise decrescente
+        self.by_discipline = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def register(self, jid, discipline, expertise, slots):
+        jid = str(jid)
+        if jid in self.entries:
+            self.unregister(jid)
+        entry = TutorEntry(jid, discipline, expertise, slots)
+        self.entries[jid] = entry
+        bisect.insort(self.by_discipline.setdefault(discipline, []), entry, key=lambda e: -e.expertise)
+
+    def unregister(self, jid):
+        entry = self.entries.pop(str(jid), None)
+        if entry is None:
+            return
+        ranked = self.by_discipline[entry.discipline]
+        ranked.remove(entry)
+        if not ranked:
+            del self.by_discipline[entry.discipline]
+
+    def update_slots(self, jid, slots):
+        entry = self.entries.get(str(jid))
+        if entry is not None:
+            entry.slots = slots
+
+    def candidates(self, topic, k=3):
+        """Até k tutores com vagas: primeiro os da disciplina, depois os restantes por expertise."""
+        chosen = []
+        for entry in self.by_discipline.get(topic, ()):
+            if len(chosen) >= k:
+                return chosen
+            if entry.slots > 0:
+                chosen.append(entry.jid)
+
+        others = [ranked for discipline, ranked in self.by_discipline.items() if discipline != topic]
+        for entry in heapq.merge(*others, key=lambda e: -e.expertise):
+            if len(chosen) >= k:
+                break
+            if entry.slots > 0:
+                chosen.append(entry.jid)
+        return chosen
+
+
+directory = TutorDirectory()
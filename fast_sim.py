@@ -0,0 +1,210 @@
+"""
+fast_sim.py - Motor de simulação vetorizado ("fast mode").
+
+Reproduz as regras de aprendizagem dos agentes sem mensagens: uma matriz
+(estudantes × tópicos) de conhecimento e as capacidades dos tutores avançam em
+rondas. Em cada ronda cada estudante ativo escolhe um tópico por terminar,
+os tutores preenchem as vagas primeiro com estudantes da sua disciplina e
+depois com os restantes (por expertise), e quem fica sem tutor recorre a um
+peer. Os ganhos são os de StudentAgent.ReceiveBehaviour:
+
+    tutor da disciplina   uniform(0.08, 0.25) * expertise
+    tutor de outra        uniform(0.05, 0.15) * expertise
+    peer                  uniform(0.03, 0.10)
+    recurso complementar  uniform(0.01, 0.05)
+
+As métricas têm o mesmo esquema do MetricsLogger, para comparar com a
+execução completa dos agentes.
+"""
+import argparse
+import time
+import numpy as np
+import clock
+from metrics import CsvSink
+from metrics_store import COLUMNS, ColumnarSink
+
+DISCIPLINES = [
+    "estatística bayesiana",
+    "aprendizagem automática",
+    "programação",
+    "estatística",
+    "português",
+    "álgebra"
+]
+LEARNING_STYLES = ["visual", "auditory", "cinestésico", "kinesthetic"]
+
+
+class FastSimulation:
+    def __init__(self, num_students, num_tutors, num_peers=1, disciplines=None, round_time=5.0, seed=None):
+        self.disciplines = list(disciplines or DISCIPLINES)
+        self.rng = np.random.default_rng(seed)
+        self.num_peers = num_peers
+        # Uma ronda ≈ um ciclo de estudo do agente (CFP + ensino + pausas)
+        self.round_time = round_time
+        self.round = 0
+        self.start = clock.time()
+
+        n_topics = len(self.disciplines)
+        self.knowledge = self.rng.uniform(0, 0.4, (num_students, n_topics))
+        self.initial_progress = self.knowledge.mean(axis=1)
+        self.styles = self.rng.integers(0, len(LEARNING_STYLES), num_students)
+
+        # Mesmas distribuições que main.py
+        self.tutor_discipline = self.rng.integers(0, n_topics, num_tutors)
+        self.tutor_expertise = self.rng.uniform(0.5, 1.0, num_tutors)
+        self.tutor_capacity = np.rint(self.rng.uniform(1, 3, num_tutors)).astype(np.int64)
+
+        self.student_names = np.array([f"student{i}" for i in range(1, num_students + 1)], dtype=object)
+        self.tutor_names = np.array([f"tutor{i}@localhost" for i in range(1, num_tutors + 1)], dtype=object)
+        self.topic_names = np.array(self.disciplines, dtype=object)
+        self.metrics = []  # um dicionário de colunas por ronda
+
+    @property
+    def progress(self):
+        return self.knowledge.mean(axis=1)
+
+    def _choose_topics(self, active):
+        # Tópico uniforme entre os que ainda não chegaram a 1.0
+        scores = self.rng.random((len(active), self.knowledge.shape[1]))
+        scores[self.knowledge[active] >= 1.0] = -1.0
+        return scores.argmax(axis=1)
+
+    def _slots(self):
+        """Vagas (uma entrada por unidade de capacidade) agrupadas por disciplina, por expertise."""
+        order = np.lexsort((-self.tutor_expertise, self.tutor_discipline))
+        slot_tutor = np.repeat(order, self.tutor_capacity[order])
+        counts = np.bincount(self.tutor_discipline[slot_tutor], minlength=len(self.disciplines))
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        return slot_tutor, counts, offsets
+
+    def _assign(self, topics, priority):
+        """Devolve (tutor por estudante ou -1, se a disciplina coincide)."""
+        n = len(topics)
+        tutor = np.full(n, -1, dtype=np.int64)
+        matching = np.zeros(n, dtype=bool)
+        slot_tutor, counts, offsets = self._slots()
+
+        # 1) Tutores da disciplina, estudantes por prioridade decrescente
+        order = np.lexsort((-priority, topics))
+        sorted_topics = topics[order]
+        demand = np.bincount(sorted_topics, minlength=len(self.disciplines))
+        group_start = np.concatenate(([0], np.cumsum(demand)[:-1]))
+        rank = np.arange(n) - group_start[sorted_topics]
+        served = rank < counts[sorted_topics]
+        tutor[order[served]] = slot_tutor[offsets[sorted_topics[served]] + rank[served]]
+        matching[order[served]] = True
+
+        # 2) Vagas que sobram vão para os restantes, pelos tutores de maior expertise
+        used = np.minimum(demand, counts)
+        slot_rank = np.arange(len(slot_tutor)) - np.repeat(offsets, counts)
+        leftover = slot_tutor[slot_rank >= np.repeat(used, counts)]
+        leftover = leftover[np.argsort(-self.tutor_expertise[leftover], kind="stable")]
+        waiting = order[~served]
+        waiting = waiting[np.argsort(-priority[waiting], kind="stable")]
+        take = min(len(waiting), len(leftover))
+        tutor[waiting[:take]] = leftover[:take]
+        return tutor, matching
+
+    def step(self):
+        """Avança uma ronda; devolve o nº de estudantes ajudados."""
+        progress = self.progress
+        active = np.flatnonzero(progress < 1.0)
+        if len(active) == 0:
+            return 0
+
+        topics = self._choose_topics(active)
+        priority = 1 - progress[active] + self.rng.uniform(0, 0.1, len(active))
+        tutor, matching = self._assign(topics, priority)
+        has_tutor = tutor >= 0
+        peer = ~has_tutor if self.num_peers > 0 else np.zeros(len(active), dtype=bool)
+        helped = has_tutor | peer
+
+        if len(self.tutor_expertise):
+            expertise = np.where(has_tutor, self.tutor_expertise[np.maximum(tutor, 0)], 0.0)
+        else:
+            expertise = np.zeros(len(active))
+        gain = np.where(
+            matching,
+            self.rng.uniform(0.08, 0.25, len(active)) * expertise,
+            self.rng.uniform(0.05, 0.15, len(active)) * expertise
+        )
+        gain = np.where(peer, self.rng.uniform(0.03, 0.10, len(active)), gain)
+
+        rows, cols = active[helped], topics[helped]
+        self.knowledge[rows, cols] = np.minimum(1.0, self.knowledge[rows, cols] + gain[helped])
+
+        # Recurso complementar para quem ainda não terminou
+        wants_resource = self.knowledge[rows].mean(axis=1) < 1.0
+        r_rows, r_cols = rows[wants_resource], cols[wants_resource]
+        self.knowledge[r_rows, r_cols] = np.minimum(
+            1.0, self.knowledge[r_rows, r_cols] + self.rng.uniform(0.01, 0.05, len(r_rows))
+        )
+
+        self.round += 1
+        self._record(active[helped], topics[helped], tutor[helped], progress[active][helped])
+        return int(helped.sum())
+
+    def _record(self, students, topics, tutor, general_progress):
+        n = len(students)
+        used_peer = tutor < 0
+        names = np.full(n, "peer", dtype=object)
+        names[~used_peer] = self.tutor_names[tutor[~used_peer]]
+        when = np.datetime64(int((self.start + self.round * self.round_time) * 1e6), "us")
+        self.metrics.append({
+            "timestamp": np.full(n, when),
+            "student": self.student_names[students],
+            "tutor": names,
+            "topic": self.topic_names[topics],
+            "general_progress": general_progress,
+            "response_time": np.full(n, self.round_time),
+            "proposals_received": (~used_peer).astype(np.int32),
+            "chosen_tutor": names,
+            "rejected_count": np.zeros(n, dtype=np.int32),
+            "peer_used": used_peer,
+        })
+
+    def run(self, rounds):
+        for _ in range(rounds):
+            if not self.step():
+                break
+        return self
+
+    def columns(self):
+        """Todas as métricas numa única tabela {coluna: array}."""
+        if not self.metrics:
+            return {name: np.array([]) for name in COLUMNS}
+        return {name: np.concatenate([m[name] for m in self.metrics]) for name in COLUMNS}
+
+    def save_metrics(self, filename, backend="csv"):
+        columns = self.columns()
+        if backend == "columnar":
+            ColumnarSink(filename).write_columns(columns)
+        else:
+            values = list(columns.values())
+            values[0] = values[0].astype("datetime64[us]").astype(object)
+            CsvSink(filename).write(zip(*(v.tolist() for v in values)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação vetorizada da dinâmica de aprendizagem")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--tutors", type=int, default=300)
+    parser.add_argument("--peers", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="ficheiro/diretório de métricas")
+    parser.add_argument("--backend", choices=["csv", "columnar"], default="columnar")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    sim = FastSimulation(args.students, args.tutors, args.peers, seed=args.seed).run(args.rounds)
+    elapsed = time.perf_counter() - t0
+    print(f"{args.students} estudantes, {sim.round} rondas em {elapsed:.2f} s")
+    print(f"Progresso médio: {sim.initial_progress.mean():.3f} -> {sim.progress.mean():.3f}")
+    if args.out:
+        sim.save_metrics(args.out, args.backend)
+        print(f"Métricas gravadas em {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,246 +1,264 @@
 # app/gui_agent_status.py
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QGroupBox, QHBoxLayout, QProgressBar, QScrollArea
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView, QHeaderView, QComboBox,
+                               QLineEdit, QDoubleSpinBox, QStyledItemDelegate, QStyleOptionProgressBar, QStyle,
+                               QApplication, QAbstractItemView)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PySide6.QtGui import QColor
+
+# Papel de dados com o valor "cru" de cada célula (ordenar e filtrar sem parsing de texto)
+SORT_ROLE = Qt.UserRole + 1
+
+COLUMNS = ["Agente", "Tipo", "Estilo / Disciplina", "Tópico", "Progresso", "Expertise", "Vagas", "Fila"]
+NAME, ROLE, DETAIL, TOPIC, PROGRESS, EXPERTISE, SLOTS, QUEUE = range(len(COLUMNS))
+
+ROLES = {"student": "Estudante", "tutor": "Tutor", "peer": "Peer"}
+ROLE_COLORS = {"student": QColor("#2E86AB"), "tutor": QColor("#F18F01"), "peer": QColor("#8E44AD")}
+QUEUE_BUSY, QUEUE_EMPTY = QColor("#C73E1D"), QColor("#4CAF50")
+
+
+def agent_role(name):
+    for role in ROLES:
+        if name.startswith(role):
+            return role
+    return None
+
+
+def _queue_length(queue):
+    # Lista de estudantes em espera, ou já o tamanho (registos do snapshots.SnapshotPublisher)
+    if isinstance(queue, int):
+        return queue
+    return len(queue or ())
+
+
+def agent_row(name, agent):
+    """Linha da tabela (tuplo imutável) a partir do dict de estado do agente."""
+    role = agent_role(name)
+    if role == "student":
+        return (name, role, agent.get('learning_style', 'N/A'), agent.get('topic') or "",
+                agent.get('progress', 0.0), None, None, None)
+    if role == "tutor":
+        return (name, role, agent.get('discipline', 'N/A'), agent.get('discipline', ""), None,
+                agent.get('expertise', 0.0), (agent.get('available_slots', 0), agent.get('capacity', 0)),
+                _queue_length(agent.get('queue')))
+    return (name, role, "🟢 Ativo", "", None, None, None, None)
+
+
+class AgentTableModel(QAbstractTableModel):
+    """Uma linha por agente; `apply` só notifica as linhas que mudaram."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []   # tuplos de agent_row
+        self._index = {}  # nome -> nº da linha
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        value = row[column]
+
+        if role == Qt.DisplayRole:
+            if value is None:
+                return ""
+            if column == ROLE:
+                return ROLES[value]
+            if column == PROGRESS:
+                return f"{value:.3f}"
+            if column == EXPERTISE:
+                return f"{value:.2f}"
+            if column == SLOTS:
+                return f"{value[0]}/{value[1]}"
+            return value
+        if role == SORT_ROLE:
+            # Sem valor (ex.: progresso de um tutor) fica no fim da ordenação ascendente
+            if column == SLOTS:
+                return value[0] if value else -1
+            if value is None:
+                return -1 if column in (PROGRESS, EXPERTISE, QUEUE) else ""
+            return value
+        if role == Qt.ForegroundRole:
+            if column in (NAME, ROLE):
+                return ROLE_COLORS.get(row[ROLE])
+            if column == QUEUE and value is not None:
+                return QUEUE_BUSY if value else QUEUE_EMPTY
+        if role == Qt.TextAlignmentRole and column in (PROGRESS, EXPERTISE, SLOTS, QUEUE):
+            return int(Qt.AlignCenter)
+        return None
+
+    def apply(self, agents):
+        """Aplica um novo estado {nome: dict}: insere agentes novos e atualiza só as linhas alteradas."""
+        rows = {name: agent_row(name, agent) for name, agent in agents.items() if agent_role(name)}
+
+        # Agentes que desapareceram (nova simulação): recomeçar a tabela
+        if any(name not in rows for name in self._index):
+            self.beginResetModel()
+            self._rows = list(rows.values())
+            self._index = {row[NAME]: i for i, row in enumerate(self._rows)}
+            self.endResetModel()
+            return
+
+        changed = []
+        new = []
+        for name, row in rows.items():
+            i = self._index.get(name)
+            if i is None:
+                new.append(row)
+            elif self._rows[i] != row:
+                self._rows[i] = row
+                changed.append(i)
+
+        # Um dataChanged por bloco de linhas consecutivas
+        last = len(COLUMNS) - 1
+        start = prev = None
+        for i in changed:
+            if start is None:
+                start = prev = i
+            elif i == prev + 1:
+                prev = i
+            else:
+                self.dataChanged.emit(self.index(start, 0), self.index(prev, last))
+                start = prev = i
+        if start is not None:
+            self.dataChanged.emit(self.index(start, 0), self.index(prev, last))
+
+        if new:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            for row in new:
+                self._index[row[NAME]] = len(self._rows)
+                self._rows.append(row)
+            self.endInsertRows()
+
+    def counts(self):
+        counts = dict.fromkeys(ROLES, 0)
+        for row in self._rows:
+            counts[row[ROLE]] += 1
+        return counts
+
+
+class AgentFilterProxy(QSortFilterProxyModel):
+    """Filtro por tipo de agente, texto (nome/tópico) e progresso mínimo."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.role = None
+        self.text = ""
+        self.min_progress = 0.0
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+
+    def set_filter(self, role=None, text="", min_progress=0.0):
+        self.role = role
+        self.text = text.lower()
+        self.min_progress = min_progress
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        row = self.sourceModel()._rows[source_row]
+        if self.role and row[ROLE] != self.role:
+            return False
+        if self.text and self.text not in row[NAME].lower() and self.text not in row[TOPIC].lower():
+            return False
+        if self.min_progress > 0 and (row[PROGRESS] is None or row[PROGRESS] < self.min_progress):
+            return False
+        return True
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """Desenha a coluna de progresso como barra (só para as linhas visíveis)."""
+
+    def paint(self, painter, option, index):
+        value = index.data(SORT_ROLE)
+        if value is None or value < 0:
+            return super().paint(painter, option, index)
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 2, -2, -2)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = int(value * 100)
+        bar.text = index.data(Qt.DisplayRole)
+        bar.textVisible = True
+        bar.state = option.state | QStyle.State_Horizontal
+        QApplication.style().drawControl(QStyle.CE_ProgressBar, bar, painter)
 
 
 class AgentStatusPanel(QWidget):
     def __init__(self):
         super().__init__()
         self.setup_ui()
-        
+
     def setup_ui(self):
         main_layout = QVBoxLayout()
-        
-        # Create scroll area
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        
-        # Create scroll content widget
-        scroll_content = QWidget()
-        scroll_layout = QVBoxLayout(scroll_content)
-        
-        # Estudantes
-        self.students_group = QGroupBox("Estudantes")
-        self.students_group.setStyleSheet("""
-            QGroupBox {
-                font-weight: bold;
-                font-size: 12px;
-                color: #2E86AB;
-                border: 2px solid #2E86AB;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-        """)
-        self.students_layout = QVBoxLayout()
-        self.students_group.setLayout(self.students_layout)
-        scroll_layout.addWidget(self.students_group)
-        
-        # Tutores
-        self.tutors_group = QGroupBox("Tutores")
-        self.tutors_group.setStyleSheet("""
-            QGroupBox {
-                font-weight: bold;
-                font-size: 12px;
-                color: #F18F01;
-                border: 2px solid #F18F01;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-        """)
-        self.tutors_layout = QVBoxLayout()
-        self.tutors_group.setLayout(self.tutors_layout)
-        scroll_layout.addWidget(self.tutors_group)
-        
-        # Peers
-        self.peers_group = QGroupBox("Peers")
-        self.peers_group.setStyleSheet("""
-            QGroupBox {
-                font-weight: bold;
-                font-size: 12px;
-                color: #8E44AD;
-                border: 2px solid #8E44AD;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-        """)
-        self.peers_layout = QVBoxLayout()
-        self.peers_group.setLayout(self.peers_layout)
-        scroll_layout.addWidget(self.peers_group)
-        
-        # Add stretch to push content to top
-        scroll_layout.addStretch()
-        
-        # Set scroll content
-        scroll_area.setWidget(scroll_content)
-        main_layout.addWidget(scroll_area)
-        
+
+        # Filtros
+        filters = QHBoxLayout()
+        self.role_filter = QComboBox()
+        self.role_filter.addItem("Todos", None)
+        self.role_filter.addItem("Estudantes", "student")
+        self.role_filter.addItem("Tutores", "tutor")
+        self.role_filter.addItem("Peers", "peer")
+        filters.addWidget(self.role_filter)
+
+        self.text_filter = QLineEdit()
+        self.text_filter.setPlaceholderText("Filtrar por nome ou tópico...")
+        filters.addWidget(self.text_filter)
+
+        filters.addWidget(QLabel("Progresso ≥"))
+        self.progress_filter = QDoubleSpinBox()
+        self.progress_filter.setRange(0.0, 1.0)
+        self.progress_filter.setSingleStep(0.05)
+        filters.addWidget(self.progress_filter)
+        main_layout.addLayout(filters)
+
+        self.counts_label = QLabel()
+        main_layout.addWidget(self.counts_label)
+
+        # Modelo -> proxy (ordenar/filtrar) -> vista virtualizada
+        self.model = AgentTableModel(self)
+        self.proxy = AgentFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setItemDelegateForColumn(PROGRESS, ProgressDelegate(self.table))
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(NAME, Qt.AscendingOrder)
+        self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        # Altura fixa: a vista não mede as linhas, só desenha as visíveis
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(20)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setColumnWidth(PROGRESS, 140)
+        main_layout.addWidget(self.table)
+
+        self.role_filter.currentIndexChanged.connect(self.apply_filter)
+        self.text_filter.textChanged.connect(self.apply_filter)
+        self.progress_filter.valueChanged.connect(self.apply_filter)
+
         self.setLayout(main_layout)
-    
+
+    def apply_filter(self):
+        self.proxy.set_filter(self.role_filter.currentData(), self.text_filter.text(), self.progress_filter.value())
+
     def update_status(self, agents):
-        # Limpar layouts anteriores
-        self.clear_layout(self.students_layout)
-        self.clear_layout(self.tutors_layout)
-        self.clear_layout(self.peers_layout)
-        
-        # Atualizar estudantes
-        for name, agent in agents.items():
-            if name.startswith("student"):
-                widget = QWidget()
-                layout = QHBoxLayout()  # Changed back to horizontal for compactness
-                layout.setContentsMargins(5, 2, 5, 2)  # Reduce margins
-                
-                # Basic info (more compact) - agent é um dict
-                basic_info = QLabel(f" {name}")
-                basic_info.setStyleSheet("font-weight: bold; color: #2E86AB; font-size: 10px;")
-                basic_info.setMinimumWidth(80)
-                layout.addWidget(basic_info)
-                
-                # Learning style
-                style_label = QLabel(f"({agent.get('learning_style', 'N/A')})")
-                style_label.setStyleSheet("color: #666; font-size: 9px;")
-                style_label.setMinimumWidth(70)
-                layout.addWidget(style_label)
-                
-                # Progress bar (compact)
-                progress_bar = QProgressBar()
-                progress_bar.setRange(0, 100)
-                progress = agent.get('progress', 0)
-                progress_bar.setValue(int(progress * 100))
-                progress_bar.setFormat(f"{progress:.3f}")
-                progress_bar.setMaximumHeight(15)
-                progress_bar.setMinimumWidth(100)
-                layout.addWidget(progress_bar)
-                
-                # Current topic if available (compact)
-                if 'topic' in agent and agent['topic']:
-                    topic_label = QLabel(f"📖 {agent['topic'][:15]}...")  # Truncate topic
-                    topic_label.setStyleSheet("color: #A23B72; font-style: italic; font-size: 9px;")
-                    topic_label.setMinimumWidth(120)
-                    layout.addWidget(topic_label)
-                else:
-                    layout.addStretch()
-                
-                widget.setLayout(layout)
-                widget.setMaximumHeight(25)  # Limit height
-                widget.setStyleSheet("""
-                    QWidget { 
-                        border: 1px solid #ddd; 
-                        border-radius: 3px; 
-                        padding: 2px; 
-                        margin: 1px;
-                        background-color: rgba(255, 255, 255, 0.8);
-                    }
-                """)
-                self.students_layout.addWidget(widget)
-            
-            elif name.startswith("tutor"):
-                widget = QWidget()
-                layout = QHBoxLayout()
-                layout.setContentsMargins(5, 2, 5, 2)
-                
-                # Tutor name - agent é um dict
-                header = QLabel(f" {name}")
-                header.setStyleSheet("font-weight: bold; color: #F18F01; font-size: 10px;")
-                header.setMinimumWidth(80)
-                layout.addWidget(header)
-                
-                # Discipline (truncated)
-                discipline = agent.get('discipline', 'N/A')
-                disc_short = discipline[:12] + "..." if len(discipline) > 12 else discipline
-                info1 = QLabel(f"📚 {disc_short}")
-                info1.setStyleSheet("color: #333; font-size: 9px;")
-                info1.setMinimumWidth(100)
-                layout.addWidget(info1)
-                
-                # Expertise
-                expertise = agent.get('expertise', 0.0)
-                info2 = QLabel(f"🎯 {expertise:.2f}")
-                info2.setStyleSheet("color: #333; font-size: 9px;")
-                info2.setMinimumWidth(50)
-                layout.addWidget(info2)
-                
-                # Slots
-                available_slots = agent.get('available_slots', 0)
-                capacity = agent.get('capacity', 0)
-                info3 = QLabel(f"👥 {available_slots}/{capacity}")
-                info3.setStyleSheet("color: #333; font-size: 9px;")
-                info3.setMinimumWidth(40)
-                layout.addWidget(info3)
-                
-                # Queue status (compact)
-                if 'queue' in agent and agent['queue']:
-                    queue_info = QLabel(f"📋 {len(agent['queue'])}")
-                    queue_info.setStyleSheet("color: #C73E1D; font-weight: bold; font-size: 9px;")
-                else:
-                    queue_info = QLabel("📋 0")
-                    queue_info.setStyleSheet("color: #4CAF50; font-size: 9px;")
-                queue_info.setMinimumWidth(30)
-                layout.addWidget(queue_info)
-                
-                widget.setLayout(layout)
-                widget.setMaximumHeight(25)
-                widget.setStyleSheet("""
-                    QWidget { 
-                        border: 1px solid #ddd; 
-                        border-radius: 3px; 
-                        padding: 2px; 
-                        margin: 1px;
-                        background-color: rgba(255, 255, 255, 0.8);
-                    }
-                """)
-                self.tutors_layout.addWidget(widget)
-                
-            elif name.startswith("peer"):
-                widget = QWidget()
-                layout = QHBoxLayout()
-                layout.setContentsMargins(5, 2, 5, 2)
-                
-                # agent é um dict, não um objeto
-                header = QLabel(f" {name}")
-                header.setStyleSheet("font-weight: bold; color: #8E44AD; font-size: 10px;")
-                layout.addWidget(header)
-                
-                status = QLabel("🟢 Ativo")
-                status.setStyleSheet("color: #4CAF50; font-size: 9px;")
-                layout.addWidget(status)
-                
-                layout.addStretch()
-                
-                widget.setLayout(layout)
-                widget.setMaximumHeight(25)
-                widget.setStyleSheet("""
-                    QWidget { 
-                        border: 1px solid #ddd; 
-                        border-radius: 3px; 
-                        padding: 2px; 
-                        margin: 1px;
-                        background-color: rgba(255, 255, 255, 0.8);
-                    }
-                """)
-                self.peers_layout.addWidget(widget)
-    
-    def clear_layout(self, layout):
-        while layout.count():
-            child = layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        # Só as linhas alteradas são notificadas (e repintadas, se visíveis)
+        self.model.apply(agents)
+        counts = self.model.counts()
+        self.counts_label.setText(f"Estudantes: {counts['student']}  |  Tutores: {counts['tutor']}  |  Peers: {counts['peer']}")
@@ -4,7 +4,58 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.collections import PolyCollection
 from matplotlib.figure import Figure
+import numpy as np
+
+
+# Acima deste nº de estudantes, em vez de uma linha por estudante mostram-se bandas (média e percentis)
+MAX_STUDENT_LINES = 20
+BAND_STATS = ("mean", "p10", "p25", "p75", "p90")
+LINE_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#FF8C94', '#A8E6CF']
+
+
+def band_verts(xs, low, high):
+    """Polígono da banda entre `low` e `high` (ida por baixo, volta por cima), para set_verts."""
+    if not len(xs):
+        return []
+    return [np.column_stack((np.concatenate([xs, xs[::-1]]), np.concatenate([low, high[::-1]])))]
+
+
+class SeriesBuffer:
+    """Série de tamanho fixo: quando enche, a metade mais antiga é reduzida a metade (um ponto em cada dois).
+
+    Os pontos recentes ficam com resolução total e os antigos cada vez mais espaçados,
+    por isso a memória e o custo de desenhar não crescem com a duração da simulação.
+    """
+
+    def __init__(self, capacity=256, width=1):
+        self.capacity = capacity - capacity % 4
+        self.x = np.empty(self.capacity)
+        self.y = np.empty((self.capacity, width))
+        self.size = 0
+
+    def append(self, x, values):
+        if self.size == self.capacity:
+            self._compact()
+        self.x[self.size] = x
+        self.y[self.size] = values
+        self.size += 1
+
+    def _compact(self):
+        half, quarter = self.capacity // 2, self.capacity // 4
+        self.x[:quarter] = self.x[:half:2]
+        self.y[:quarter] = self.y[:half:2]
+        self.x[quarter:quarter + half] = self.x[half:]
+        self.y[quarter:quarter + half] = self.y[half:]
+        self.size = quarter + half
+
+    @property
+    def xs(self):
+        return self.x[:self.size]
+
+    def ys(self, column=0):
+        return self.y[:self.size, column]
 
 
 class LogsTab(QWidget):
@@ -48,10 +99,12 @@ class MetricsTab(QWidget):
     def __init__(self):
         super().__init__()
         
-        # Armazenar histórico de progresso para cada estudante
-        self.progress_history = {}  # {student_name: [progress_values]}
-        self.time_points = []  # Lista de pontos de tempo
+        # Histórico limitado: um buffer por estudante e um para as bandas agregadas
+        self.progress_history = {}  # {student_name: SeriesBuffer}
+        self.bands = SeriesBuffer(width=len(BAND_STATS))
         self.update_count = 0
+        self._artists = None  # artistas persistentes, criados no primeiro update
+        self._background = None
         
         # Main layout
         main_layout = QVBoxLayout()
@@ -74,6 +127,8 @@ class MetricsTab(QWidget):
         
         # Set minimum size for better visibility
         self.canvas.setMinimumSize(800, 600)
+        # Cada redesenho completo guarda o fundo para os updates por blit
+        self.canvas.mpl_connect("draw_event", self._on_draw)
         
         content_layout.addWidget(self.canvas)
         content_layout.addStretch()  # Add stretch to prevent compression
@@ -88,8 +143,10 @@ class MetricsTab(QWidget):
     def clear_metrics(self):
         """Limpa todos os dados históricos e gráficos"""
         self.progress_history = {}
-        self.time_points = []
+        self.bands = SeriesBuffer(width=len(BAND_STATS))
         self.update_count = 0
+        self._artists = None
+        self._background = None
         
         # Limpar figura
         self.figure.clear()
@@ -98,138 +155,229 @@ class MetricsTab(QWidget):
                ha='center', va='center', transform=ax.transAxes, fontsize=14)
         ax.axis('off')
         self.canvas.draw()
-        
+
+    # ---------- artistas persistentes ----------
+    def _build(self):
+        """Cria os eixos uma vez; daqui em diante os artistas são atualizados no lugar."""
+        self.figure.clear()
+        ax1 = self.figure.add_subplot(2, 2, 1)
+        ax2 = self.figure.add_subplot(2, 2, 2)
+        ax3 = self.figure.add_subplot(2, 2, 3)
+        ax4 = self.figure.add_subplot(2, 2, 4)
+
+        ax1.set_title('Progresso Geral dos Estudantes')
+        ax1.set_xlabel('Tempo')
+        ax1.set_ylabel('Progresso escolar')
+        ax1.set_ylim(0, 1)
+        ax1.set_xlim(0, 16)
+        ax1.grid(True, alpha=0.3)
+        mean_line, = ax1.plot([], [], color='#2E86AB', linewidth=2, label='Média', animated=True)
+        # Bandas p10–p90 e p25–p75: um artista cada, só os vértices mudam
+        bands = [
+            PolyCollection([], facecolor='#2E86AB', edgecolor='none', alpha=0.15, label='p10–p90', animated=True),
+            PolyCollection([], facecolor='#2E86AB', edgecolor='none', alpha=0.3, label='p25–p75', animated=True),
+        ]
+        for band in bands:
+            band.set_visible(False)
+            ax1.add_collection(band, autolim=False)
+
+        ax2.set_title('Status dos Tutores')
+        ax2.set_ylabel('Slots')
+        # Forçar eixo Y a mostrar apenas números inteiros
+        ax2.yaxis.set_major_locator(plt.MaxNLocator(integer=True))
+
+        ax3.set_title('Estilos de Aprendizagem')
+
+        # Gráfico 4: barras fixas, só a altura/cor/valor de 'Atual' muda
+        categories = ['Inicial', 'Atual', 'Meta']
+        progress_bars = ax4.bar(categories, [0.0, 0.0, 1.0], color=['red', 'orange', 'lightgreen'], alpha=0.7)
+        ax4.set_title('Progresso Médio Geral')
+        ax4.set_ylabel('Progresso')
+        ax4.set_ylim(0, 1.1)
+        progress_labels = [ax4.text(bar.get_x() + bar.get_width() / 2., bar.get_height() + 0.01, '',
+                                    ha='center', va='bottom', animated=True) for bar in progress_bars]
+        for bar in progress_bars:
+            bar.set_animated(True)
+
+        self._artists = {
+            "axes": (ax1, ax2, ax3, ax4),
+            "lines": {},  # estudante -> Line2D
+            "mean": mean_line,
+            "bands": bands,  # PolyCollections p10–p90 e p25–p75 (vértices atualizados a cada update)
+            "aggregate": None,
+            "tutor_names": None,
+            "capacity_bars": [],
+            "slot_bars": [],
+            "styles": None,
+            "progress_bars": progress_bars,
+            "progress_labels": progress_labels,
+        }
+        self.figure.tight_layout()
+
+    def _animated(self):
+        """Artistas redesenhados a cada update (por cima do fundo guardado)."""
+        a = self._artists
+        artists = [line for line in a["lines"].values() if line.get_visible()]
+        artists += [band for band in a["bands"] if band.get_visible()] + [a["mean"]] + list(a["slot_bars"])
+        artists += list(a["progress_bars"]) + a["progress_labels"]
+        return artists
+
+    def _on_draw(self, event):
+        if self._artists is None:
+            return
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self._animated():
+            self.figure.draw_artist(artist)
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        for artist in self._animated():
+            self.figure.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+        self.canvas.flush_events()
+
+    def _update_progress(self, students):
+        """Gráfico 1: linhas por estudante (poucos) ou bandas de percentis (muitos). Devolve True se o fundo mudou."""
+        a = self._artists
+        ax1 = a["axes"][0]
+        t = self.update_count
+        progress = np.fromiter((s.get('progress', 0) for s in students.values()), float, len(students))
+        p10, p25, p75, p90 = np.percentile(progress, [10, 25, 75, 90])
+        self.bands.append(t, (progress.mean(), p10, p25, p75, p90))
+
+        full_redraw = False
+        aggregate = len(students) > MAX_STUDENT_LINES
+        if aggregate != a["aggregate"]:
+            a["aggregate"] = aggregate
+            for line in a["lines"].values():
+                line.set_visible(not aggregate)
+            for band in a["bands"]:
+                band.set_visible(aggregate)
+            full_redraw = True
+
+        if not aggregate:
+            for name, student in students.items():
+                history = self.progress_history.get(name)
+                if history is None:
+                    history = self.progress_history[name] = SeriesBuffer()
+                    history.append(t - 1, student.get('initial_progress', 0))
+                    color = LINE_COLORS[len(a["lines"]) % len(LINE_COLORS)]
+                    a["lines"][name], = ax1.plot([], [], marker='o', linestyle='-', linewidth=2, markersize=4,
+                                                 label=name.replace('student', 'Student '), color=color, animated=True)
+                    full_redraw = True  # legenda nova
+                history.append(t, student.get('progress', 0))
+                a["lines"][name].set_data(history.xs, history.ys())
+
+        # Média sempre; bandas só no modo agregado
+        xs = self.bands.xs
+        a["mean"].set_data(xs, self.bands.ys(0))
+        if aggregate:
+            outer, inner = a["bands"]
+            outer.set_verts(band_verts(xs, self.bands.ys(1), self.bands.ys(4)))
+            inner.set_verts(band_verts(xs, self.bands.ys(2), self.bands.ys(3)))
+
+        # O eixo X cresce aos saltos (dobra), para não invalidar o fundo a cada update
+        if t >= ax1.get_xlim()[1]:
+            ax1.set_xlim(0, 2 * t)
+            full_redraw = True
+        if full_redraw:
+            handles = [a["mean"]]
+            if aggregate:
+                handles = list(a["bands"]) + handles
+            if not aggregate:
+                handles += list(a["lines"].values())[:MAX_STUDENT_LINES]
+            ax1.legend(handles=handles, loc='best', fontsize=8)
+        return full_redraw, progress.mean()
+
+    def _update_tutors(self, tutors):
+        a = self._artists
+        ax2 = a["axes"][1]
+        names = list(tutors)
+        slots = [tutor.get('available_slots', 0) for tutor in tutors.values()]
+        if names == a["tutor_names"]:
+            for bar, value in zip(a["slot_bars"], slots):
+                bar.set_height(value)
+            return False
+
+        # Tutores diferentes: recriar as barras (raro)
+        ax2.clear()
+        x = range(len(names))
+        capacities = [tutor.get('capacity', 1) for tutor in tutors.values()]
+        a["capacity_bars"] = ax2.bar(x, capacities, alpha=0.3, label='Capacidade Total', color='lightgreen')
+        a["slot_bars"] = ax2.bar(x, slots, alpha=0.8, label='Slots Disponíveis', color='green')
+        for bar in a["slot_bars"]:
+            bar.set_animated(True)
+        ax2.set_title('Status dos Tutores')
+        ax2.set_xticks(x)
+        ax2.set_xticklabels([name.replace('tutor', 'T') for name in names])
+        ax2.set_ylim(0, max(capacities, default=1) + 0.5)
+        ax2.legend()
+        ax2.set_ylabel('Slots')
+        ax2.yaxis.set_major_locator(plt.MaxNLocator(integer=True))
+        a["tutor_names"] = names
+        return True
+
+    def _update_styles(self, students):
+        """Gráfico 3: o pie só é refeito quando a distribuição de estilos muda."""
+        a = self._artists
+        styles = {}
+        for student in students.values():
+            style = student.get('learning_style', 'unknown')
+            styles[style] = styles.get(style, 0) + 1
+        if styles == a["styles"]:
+            return False
+        ax3 = a["axes"][2]
+        ax3.clear()
+        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+        ax3.pie(styles.values(), labels=styles.keys(), autopct='%1.1f%%', colors=colors[:len(styles)])
+        ax3.set_title('Estilos de Aprendizagem')
+        a["styles"] = styles
+        return True
+
+    def _update_average(self, avg_progress):
+        a = self._artists
+        values = [0.0, avg_progress, 1.0]
+        current = a["progress_bars"][1]
+        current.set_height(avg_progress)
+        current.set_color('orange' if avg_progress < 0.5 else 'green')
+        for bar, label, value in zip(a["progress_bars"], a["progress_labels"], values):
+            label.set_text(f'{value:.3f}')
+            label.set_y(bar.get_height() + 0.01)
+
     def update_metrics(self, agents):
         if not agents:
             return
             
         try:
-            self.figure.clear()
-            
-            # Criar subplots
-            ax1 = self.figure.add_subplot(2, 2, 1)
-            ax2 = self.figure.add_subplot(2, 2, 2)
-            ax3 = self.figure.add_subplot(2, 2, 3)
-            ax4 = self.figure.add_subplot(2, 2, 4)
-            
             # Filter agents safely (agents agora são dicts)
             students = {name: a for name, a in agents.items() if name.startswith("student")}
             tutors = {name: a for name, a in agents.items() if name.startswith("tutor")}
-            peers = {name: a for name, a in agents.items() if name.startswith("peer")}
-            
-            # Gráfico 1: Progresso individual dos estudantes ao longo do tempo
+            if not students and not tutors:
+                return
+
+            if self._artists is None:
+                self._build()
+            self.update_count += 1
+
+            full_redraw = self._background is None
             if students:
-                # Atualizar histórico de progresso
-                self.update_count += 1
-                self.time_points.append(self.update_count)
-                
-                for name, student in students.items():
-                    current_progress = student.get('progress', 0)
-                    
-                    # Inicializar histórico se for primeira vez
-                    if name not in self.progress_history:
-                        initial = student.get('initial_progress', 0)
-                        self.progress_history[name] = [initial]
-                    
-                    # Adicionar progresso atual
-                    self.progress_history[name].append(current_progress)
-                
-                # Plotar linhas para cada estudante
-                colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#FF8C94', '#A8E6CF']
-                for idx, (name, history) in enumerate(self.progress_history.items()):
-                    color = colors[idx % len(colors)]
-                    label = name.replace('student', 'Student ')
-                    
-                    # Garantir que history e time_points têm mesmo tamanho
-                    x_data = list(range(len(history)))
-                    ax1.plot(x_data, history, marker='o', linestyle='-', linewidth=2,
-                            markersize=6, label=label, color=color)
-                
-                ax1.set_title('Progresso Geral dos Estudantes')
-                ax1.set_xlabel('Tempo')
-                ax1.set_ylabel('Progresso escolar')
-                ax1.set_ylim(0, 1)
-                ax1.legend(loc='best')
-                ax1.grid(True, alpha=0.3)
-            else:
-                ax1.text(0.5, 0.5, 'Waiting for\nstudent data', 
-                        ha='center', va='center', transform=ax1.transAxes)
-                ax1.set_title('Student Progress Over Time')
-            
-            # Gráfico 2: Status dos tutores
+                changed, avg_progress = self._update_progress(students)
+                full_redraw |= changed
+                full_redraw |= self._update_styles(students)
+                self._update_average(avg_progress)
             if tutors:
-                tutor_names = []
-                available_slots = []
-                capacities = []
-                
-                for name, tutor in tutors.items():
-                    discipline = tutor.get('discipline', 'N/A')[:10]  # Truncar
-                    tutor_names.append(f"{name}\n({discipline})")
-                    available_slots.append(tutor.get('available_slots', 0))
-                    capacities.append(tutor.get('capacity', 1))
-                
-                x = range(len(tutor_names))
-                ax2.bar(x, capacities, alpha=0.3, label='Capacidade Total', color='lightgreen')
-                ax2.bar(x, available_slots, alpha=0.8, label='Slots Disponíveis', color='green')
-                ax2.set_title('Status dos Tutores')
-                ax2.set_xticks(x)
-                ax2.set_xticklabels([name.split('\n')[0].replace('tutor', 'T') for name in tutor_names])
-                ax2.legend()
-                ax2.set_ylabel('Slots')
-                # Forçar eixo Y a mostrar apenas números inteiros
-                ax2.yaxis.set_major_locator(plt.MaxNLocator(integer=True))
-            else:
-                ax2.text(0.5, 0.5, 'Aguardando dados\ndos tutores', 
-                        ha='center', va='center', transform=ax2.transAxes)
-                ax2.set_title('Status dos Tutores')
-            
-            # Gráfico 3: Distribuição de estilos de aprendizagem
-            if students:
-                styles = {}
-                for name, student in students.items():
-                    style = student.get('learning_style', 'unknown')
-                    styles[style] = styles.get(style, 0) + 1
-                
-                if styles:
-                    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-                    ax3.pie(styles.values(), labels=styles.keys(), autopct='%1.1f%%', 
-                           colors=colors[:len(styles)])
-                    ax3.set_title('Estilos de Aprendizagem')
-            else:
-                ax3.text(0.5, 0.5, 'Aguardando dados\ndos estilos', 
-                        ha='center', va='center', transform=ax3.transAxes)
-                ax3.set_title('Estilos de Aprendizagem')
-            
-            # Gráfico 4: Progresso médio vs tempo (simulado)
-            if students:
-                progress_values = [student.get('progress', 0) for student in students.values()]
-                avg_progress = sum(progress_values) / len(progress_values)
-                
-                # Create a simple progress indicator
-                categories = ['Inicial', 'Atual', 'Meta']
-                values = [0.0, avg_progress, 1.0]
-                colors = ['red', 'orange' if avg_progress < 0.5 else 'green', 'lightgreen']
-                
-                bars = ax4.bar(categories, values, color=colors, alpha=0.7)
-                ax4.set_title('Progresso Médio Geral')
-                ax4.set_ylabel('Progresso')
-                ax4.set_ylim(0, 1)
-                
-                # Add value labels on bars
-                for bar, value in zip(bars, values):
-                    height = bar.get_height()
-                    ax4.text(bar.get_x() + bar.get_width()/2., height + 0.01,
-                            f'{value:.3f}', ha='center', va='bottom')
+                full_redraw |= self._update_tutors(tutors)
+
+            # Redesenho completo só quando os eixos/legendas mudam; caso contrário, blit dos artistas
+            if full_redraw:
+                self.canvas.draw()
             else:
-                ax4.text(0.5, 0.5, 'Aguardando dados\nde progresso', 
-                        ha='center', va='center', transform=ax4.transAxes)
-                ax4.set_title('Progresso Médio Geral')
-            
-            self.figure.tight_layout()
-            self.canvas.draw()
+                self._blit()
             
         except Exception as e:
             # If there's any error, show a message
+            self._artists = None
+            self._background = None
             self.figure.clear()
             ax = self.figure.add_subplot(1, 1, 1)
             ax.text(0.5, 0.5, f'Erro ao atualizar métricas:\n{str(e)}', 
@@ -0,0 +1,341 @@
+"""
+instrumentation.py - Instrumentação por agente e por behaviour.
+
+Com `instrumentation.enable()` passam a ser medidos, para cada agente:
+
+* mensagens enviadas/recebidas por performative;
+* profundidade da mailbox (soma das filas dos behaviours);
+* duração de cada run() (e do on_start) por behaviour, em histograma;
+* tempo em sleeps, à espera de mensagens e a trabalhar.
+
+A medição é feita substituindo métodos do SPADE e do projeto (`_run`, `send`,
+`receive`, `clock.sleep`, `lifecycle.receive`) e, ao arrancar cada behaviour,
+o `on_start` dessa instância; `disable()` repõe os originais, por isso
+desligada não custa nada. `snapshot()` devolve um dicionário e
+`serve()` expõe o mesmo em texto Prometheus em localhost.
+"""
+import asyncio
+import contextvars
+import time
+from bisect import bisect_left
+from collections import Counter
+from spade import behaviour as spade_behaviour
+from spade.message import Message
+from colorama import Fore, Style
+import clock
+from lifecycle import Lifecycle
+
+# Limites superiores (s) dos buckets do histograma de run()
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, float("inf"))
+
+_frame = contextvars.ContextVar("instrumentation_frame", default=None)
+
+
+class _Frame:
+    """Tempos de espera acumulados durante uma execução de run()/on_start."""
+    __slots__ = ("sleep", "wait", "active")
+
+    def __init__(self):
+        self.sleep = 0.0
+        self.wait = 0.0
+        self.active = True
+
+
+class BehaviourStats:
+    def __init__(self):
+        self.runs = 0
+        self.running = 0  # execuções em curso (ex.: on_start com o ciclo de estudo)
+        self.buckets = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.max = 0.0
+        self.sleep = 0.0
+        self.wait = 0.0
+
+    def observe(self, duration, frame):
+        self.runs += 1
+        self.buckets[bisect_left(BUCKETS, duration)] += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.sleep += frame.sleep
+        self.wait += frame.wait
+
+    @property
+    def work(self):
+        return max(0.0, self.total - self.sleep - self.wait)
+
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "running": self.running,
+            "total_s": self.total,
+            "mean_s": self.total / self.runs if self.runs else 0.0,
+            "max_s": self.max,
+            "sleep_s": self.sleep,
+            "wait_s": self.wait,
+            "work_s": self.work,
+            "histogram": dict(zip(BUCKETS, self.buckets)),
+        }
+
+
+class AgentStats:
+    def __init__(self, agent):
+        self.agent = agent
+        self.sent = Counter()
+        self.received = Counter()
+        self.behaviours = {}  # nome -> BehaviourStats
+
+    def mailbox_depth(self):
+        return sum(b.queue.qsize() for b in self.agent.behaviours)
+
+    def as_dict(self):
+        return {
+            "sent": dict(self.sent),
+            "received": dict(self.received),
+            "mailbox_depth": self.mailbox_depth(),
+            "behaviours": {name: stats.as_dict() for name, stats in self.behaviours.items()},
+        }
+
+
+def _behaviour_name(behaviour):
+    return type(behaviour).__name__
+
+
+class Instrumentation:
+    def __init__(self):
+        self.enabled = False
+        self.agents = {}  # nome -> AgentStats
+        self._originals = {}
+
+    def reset(self):
+        self.agents = {}
+
+    def _agent(self, agent):
+        stats = self.agents.get(agent.name)
+        if stats is None or stats.agent is not agent:
+            stats = self.agents[agent.name] = AgentStats(agent)
+        return stats
+
+    def _behaviour(self, behaviour):
+        behaviours = self._agent(behaviour.agent).behaviours
+        name = _behaviour_name(behaviour)
+        if name not in behaviours:
+            behaviours[name] = BehaviourStats()
+        return behaviours[name]
+
+    # ---------- ligar / desligar ----------
+    def enable(self):
+        if self.enabled:
+            return
+        cyclic = spade_behaviour.CyclicBehaviour
+        self._originals = {
+            "_run": cyclic._run,
+            "start": cyclic.start,
+            "send": cyclic.send,
+            "receive": cyclic.receive,
+            "lifecycle_receive": Lifecycle.receive,
+            "sleep": clock.sleep,
+        }
+        cyclic._run = self._timed(cyclic._run)
+        cyclic.start = self._timed_start(cyclic.start)
+        cyclic.send = self._counted_send(cyclic.send)
+        cyclic.receive = self._counted_receive(cyclic.receive)
+        Lifecycle.receive = self._counted_lifecycle_receive(Lifecycle.receive)
+        clock.sleep = self._timed_sleep(clock.sleep)
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        cyclic = spade_behaviour.CyclicBehaviour
+        cyclic._run = self._originals["_run"]
+        cyclic.start = self._originals["start"]
+        cyclic.send = self._originals["send"]
+        cyclic.receive = self._originals["receive"]
+        Lifecycle.receive = self._originals["lifecycle_receive"]
+        clock.sleep = self._originals["sleep"]
+        self.enabled = False
+
+    # ---------- wrappers ----------
+    def _timed(self, run):
+        instrumentation = self
+
+        async def _run(behaviour):
+            stats = instrumentation._behaviour(behaviour)
+            frame = _Frame()
+            token = _frame.set(frame)
+            t0 = time.perf_counter()
+            try:
+                await run(behaviour)
+            finally:
+                frame.active = False
+                _frame.reset(token)
+                stats.observe(time.perf_counter() - t0, frame)
+
+        return _run
+
+    def _timed_start(self, start):
+        instrumentation = self
+
+        # Ao arrancar, o on_start desta instância passa a ser medido como um run
+        # (o _start do SPADE chama self.on_start(), que encontra o wrapper)
+        def timed_start(behaviour):
+            on_start = behaviour.on_start
+            if not getattr(on_start, "_instrumented", False):
+                async def timed_on_start():
+                    if not instrumentation.enabled:
+                        return await on_start()
+                    stats = instrumentation._agent(behaviour.agent).behaviours.setdefault(
+                        f"{_behaviour_name(behaviour)}.on_start", BehaviourStats())
+                    frame = _Frame()
+                    token = _frame.set(frame)
+                    t0 = time.perf_counter()
+                    stats.running += 1
+                    try:
+                        await on_start()
+                    finally:
+                        stats.running -= 1
+                        frame.active = False
+                        _frame.reset(token)
+                        stats.observe(time.perf_counter() - t0, frame)
+
+                timed_on_start._instrumented = True
+                behaviour.on_start = timed_on_start
+            return start(behaviour)
+
+        return timed_start
+
+    def _counted_send(self, send):
+        instrumentation = self
+
+        async def counted_send(behaviour, msg):
+            instrumentation._agent(behaviour.agent).sent[msg.get_metadata("performative")] += 1
+            await send(behaviour, msg)
+
+        return counted_send
+
+    def _waited(self, received):
+        frame = _frame.get()
+        if frame is not None and frame.active:
+            frame.wait += received
+
+    def _counted_receive(self, receive):
+        instrumentation = self
+
+        async def counted_receive(behaviour, timeout=None):
+            t0 = time.perf_counter()
+            msg = await receive(behaviour, timeout)
+            instrumentation._waited(time.perf_counter() - t0)
+            if msg is not None:
+                instrumentation._agent(behaviour.agent).received[msg.get_metadata("performative")] += 1
+            return msg
+
+        return counted_receive
+
+    def _counted_lifecycle_receive(self, receive):
+        instrumentation = self
+
+        async def counted_receive(lifecycle, behaviour, timeout=None):
+            t0 = time.perf_counter()
+            msg = await receive(lifecycle, behaviour, timeout)
+            instrumentation._waited(time.perf_counter() - t0)
+            # Os workers recebem lotes internos, não mensagens
+            if isinstance(msg, Message):
+                instrumentation._agent(behaviour.agent).received[msg.get_metadata("performative")] += 1
+            return msg
+
+        return counted_receive
+
+    def _timed_sleep(self, sleep):
+        async def timed_sleep(delay):
+            t0 = time.perf_counter()
+            await sleep(delay)
+            frame = _frame.get()
+            if frame is not None and frame.active:
+                frame.sleep += time.perf_counter() - t0
+
+        return timed_sleep
+
+    # ---------- leitura ----------
+    def snapshot(self):
+        """Estado atual de todos os agentes instrumentados ({nome: {...}})."""
+        return {name: stats.as_dict() for name, stats in self.agents.items()}
+
+    def prometheus_text(self):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        metric("isia_messages_sent_total", "counter", "Mensagens enviadas por performative")
+        for agent, stats in self.agents.items():
+            for perf, count in stats.sent.items():
+                lines.append(f'isia_messages_sent_total{{agent="{agent}",performative="{perf}"}} {count}')
+        metric("isia_messages_received_total", "counter", "Mensagens recebidas por performative")
+        for agent, stats in self.agents.items():
+            for perf, count in stats.received.items():
+                lines.append(f'isia_messages_received_total{{agent="{agent}",performative="{perf}"}} {count}')
+        metric("isia_mailbox_depth", "gauge", "Mensagens por ler nas filas dos behaviours")
+        for agent, stats in self.agents.items():
+            lines.append(f'isia_mailbox_depth{{agent="{agent}"}} {stats.mailbox_depth()}')
+        metric("isia_behaviour_run_seconds", "histogram", "Duração de cada run() por behaviour")
+        for agent, stats in self.agents.items():
+            for name, b in stats.behaviours.items():
+                labels = f'agent="{agent}",behaviour="{name}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, b.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'isia_behaviour_run_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"isia_behaviour_run_seconds_sum{{{labels}}} {b.total}")
+                lines.append(f"isia_behaviour_run_seconds_count{{{labels}}} {b.runs}")
+        metric("isia_behaviour_time_seconds", "counter", "Tempo dentro de run() por tipo (work/sleep/wait)")
+        for agent, stats in self.agents.items():
+            for name, b in stats.behaviours.items():
+                for kind, value in (("work", b.work), ("sleep", b.sleep), ("wait", b.wait)):
+                    lines.append(f'isia_behaviour_time_seconds{{agent="{agent}",behaviour="{name}",kind="{kind}"}} {value}')
+        metric("isia_behaviour_running", "gauge", "Execuções de run()/on_start ainda em curso")
+        for agent, stats in self.agents.items():
+            for name, b in stats.behaviours.items():
+                lines.append(f'isia_behaviour_running{{agent="{agent}",behaviour="{name}"}} {b.running}')
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host="127.0.0.1", port=9108):
+        """Endpoint HTTP mínimo: qualquer GET devolve prometheus_text()."""
+        async def handle(reader, writer):
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                writer.close()
+                return
+            body = self.prometheus_text().encode("utf-8")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        print(Fore.CYAN + f"[Instrumentation] métricas em http://{host}:{port}/metrics" + Style.RESET_ALL)
+        return server
+
+    def print_summary(self, top=5):
+        """Behaviours com mais tempo de trabalho (somados por tipo de agente)."""
+        totals = {}
+        for agent, stats in self.agents.items():
+            kind = agent.rstrip("0123456789")
+            for name, b in stats.behaviours.items():
+                t = totals.setdefault((kind, name), [0, 0.0, 0.0, 0.0, 0])
+                t[0] += b.runs
+                t[1] += b.work
+                t[2] += b.sleep
+                t[3] += b.wait
+                t[4] += b.running
+        print(Fore.CYAN + "[Instrumentation] behaviours por tempo de trabalho:" + Style.RESET_ALL)
+        for (kind, name), (runs, work, sleep, wait, running) in sorted(totals.items(), key=lambda item: -item[1][1])[:top]:
+            label = f"{kind}.{name}"
+            # Um on_start que ainda não acabou não conta em runs (nem no tempo): mostrar à parte
+            pending = f" running={running}" if running else ""
+            print(f"    {label:<36} runs={runs:<7} work={work:.3f}s sleep={sleep:.3f}s wait={wait:.3f}s{pending}")
+
+
+instrumentation = Instrumentation()
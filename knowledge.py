@@ -0,0 +1,89 @@
+"""
+knowledge.py - Estado de conhecimento de um estudante por tópico.
+
+Os valores vivem num array NumPy com um mapa tópico→índice fixo, partilhado
+por todos os estudantes com a mesma lista de tópicos. A soma é mantida
+incrementalmente, por isso `progress` é O(1) seja qual for o nº de tópicos.
+A soma é feita em vírgula fixa (inteiros), sem erro acumulado: com todos os
+tópicos a 1.0 o progresso é exatamente 1.0.
+Mantém a interface de dicionário usada pelos behaviours (`knowledge[topic]`).
+"""
+import numpy as np
+
+_indexes = {}  # tuplo de tópicos -> {tópico: índice}
+
+SCALE = 2 ** 52
+
+
+def _topic_index(topics):
+    topics = tuple(topics)
+    if topics not in _indexes:
+        _indexes[topics] = {topic: i for i, topic in enumerate(topics)}
+    return topics, _indexes[topics]
+
+
+class KnowledgeState:
+    __slots__ = ("topics", "index", "_values", "_sum")
+
+    def __init__(self, topics, values=None):
+        self.topics, self.index = _topic_index(topics)
+        if not self.topics:
+            raise ValueError("É necessário pelo menos um tópico")
+        if values is None:
+            self._values = np.zeros(len(self.topics))
+        else:
+            self._values = np.array(values, dtype=np.float64)
+        self._sum = sum(_fixed(v) for v in self._values.tolist())
+
+    def __getitem__(self, topic):
+        return float(self._values[self.index[topic]])
+
+    def __setitem__(self, topic, value):
+        i = self.index[topic]
+        self._sum += _fixed(value) - _fixed(float(self._values[i]))
+        self._values[i] = value
+
+    def __len__(self):
+        return len(self.topics)
+
+    def __iter__(self):
+        return iter(self.topics)
+
+    def __contains__(self, topic):
+        return topic in self.index
+
+    def __repr__(self):
+        return repr(self.as_dict())
+
+    def keys(self):
+        return self.topics
+
+    def values(self):
+        return self.view()
+
+    def items(self):
+        return zip(self.topics, self._values.tolist())
+
+    def view(self):
+        """Array só de leitura com os valores por tópico (sem cópia)."""
+        view = self._values.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def total(self):
+        return self._sum / SCALE
+
+    @property
+    def progress(self):
+        return self._sum / (SCALE * len(self.topics))
+
+    def as_dict(self):
+        return dict(self.items())
+
+    def copy(self):
+        return KnowledgeState(self.topics, self._values)
+
+
+def _fixed(value):
+    return round(value * SCALE)
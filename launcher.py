@@ -0,0 +1,163 @@
+"""
+launcher.py - Arranque e paragem concorrentes de agentes.
+
+Os agentes arrancam em paralelo (até `concurrency` de cada vez), cada um com o
+seu timeout. Para cada agente mede-se o tempo de registo, ligação e setup.
+Só depois de todos estarem prontos é que `release()` liga o flag
+`can_start_studying` / `can_start_helping` de cada agente; o sinal de início
+global (`lifecycle.start()`) é dado a seguir por quem corre a simulação.
+"""
+import asyncio
+import time
+from colorama import Fore, Style
+from lifecycle import lifecycle, LifecycleMixin
+
+PHASES = ["register", "connect", "setup"]
+
+
+class AgentLauncher:
+    def __init__(self, bus=None, concurrency=50, start_timeout=30.0, stop_timeout=10.0):
+        self.bus = bus
+        self.concurrency = concurrency
+        self.start_timeout = start_timeout
+        self.stop_timeout = stop_timeout
+        self.timings = {}  # nome -> {fase: segundos}
+        self.ready = set()
+        self.failed = {}  # nome -> motivo
+        self.all_ready = asyncio.Event()
+
+    def _instrument(self, name, agent):
+        """Envolve setup() e a ligação XMPP do agente para medir cada fase."""
+        timings = self.timings.setdefault(name, {phase: 0.0 for phase in PHASES})
+
+        setup = agent.setup
+
+        async def timed_setup():
+            t0 = time.perf_counter()
+            try:
+                await setup()
+            finally:
+                timings["setup"] = time.perf_counter() - t0
+
+        agent.setup = timed_setup
+
+        if self.bus is not None:
+            return
+
+        connect = agent._async_connect
+
+        async def timed_connect():
+            # O cliente já existe aqui; o registo in-band corre dentro da ligação
+            client = agent.client
+            register = getattr(client, "register", None)
+            if register is not None and client.event_handled("register"):
+                async def timed_register(event):
+                    r0 = time.perf_counter()
+                    try:
+                        await register(event)
+                    finally:
+                        timings["register"] += time.perf_counter() - r0
+
+                client.del_event_handler("register", register)
+                client.add_event_handler("register", timed_register)
+
+            t0 = time.perf_counter()
+            try:
+                await connect()
+            finally:
+                timings["connect"] = time.perf_counter() - t0 - timings["register"]
+
+        agent._async_connect = timed_connect
+
+    async def _start_one(self, name, agent, semaphore):
+        async with semaphore:
+            self._instrument(name, agent)
+            t0 = time.perf_counter()
+            try:
+                if self.bus is not None:
+                    start = self.bus.start(agent)
+                else:
+                    start = agent.start(auto_register=True)
+                await asyncio.wait_for(start, timeout=self.start_timeout)
+            except asyncio.TimeoutError:
+                self.failed[name] = f"timeout ({self.start_timeout}s)"
+            except Exception as e:
+                self.failed[name] = f"{type(e).__name__}: {e}"
+            else:
+                self.ready.add(name)
+            finally:
+                self.timings[name]["total"] = time.perf_counter() - t0
+
+        if name in self.failed:
+            print(Fore.RED + f"[Launcher] ❌ {name} não arrancou: {self.failed[name]}" + Style.RESET_ALL)
+
+    async def start_all(self, agents):
+        """Arranca todos os agentes ({nome: agente}); devolve o relatório de tempos."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._start_one(name, agent, semaphore) for name, agent in agents.items()))
+        elapsed = time.perf_counter() - t0
+
+        if not self.failed:
+            self.all_ready.set()
+        report = self.report(elapsed)
+        self.print_report(report)
+        return report
+
+    def release(self, agents):
+        """Autoriza o início de cada agente: só quando todos estão prontos."""
+        if not self.all_ready.is_set():
+            raise RuntimeError(f"{len(self.failed)} agente(s) não ficaram prontos: {sorted(self.failed)}")
+        for agent in agents.values():
+            if isinstance(agent, LifecycleMixin):
+                agent.can_start_studying = True
+        print(Fore.GREEN + f"[Launcher] 🚦 {len(agents)} agentes autorizados a começar" + Style.RESET_ALL)
+
+    async def _stop_one(self, name, agent, semaphore):
+        async with semaphore:
+            agent.is_stopping = True
+            try:
+                if self.bus is not None:
+                    stop = self.bus.stop(agent)
+                else:
+                    stop = agent.stop()
+                await asyncio.wait_for(stop, timeout=self.stop_timeout)
+            except asyncio.TimeoutError:
+                print(Fore.RED + f"[Launcher] ⚠️ {name} não parou em {self.stop_timeout}s" + Style.RESET_ALL)
+            except Exception as e:
+                print(Fore.RED + f"[Launcher] ⚠️ Erro ao parar {name}: {e}" + Style.RESET_ALL)
+
+    async def stop_all(self, agents):
+        """Para todos os agentes em paralelo; devolve o tempo total (s)."""
+        # Acordar de imediato os behaviours que esperam por mensagens
+        lifecycle.stop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._stop_one(name, agent, semaphore) for name, agent in agents.items()))
+        self.all_ready.clear()
+        return time.perf_counter() - t0
+
+    def report(self, elapsed):
+        phases = {}
+        for phase in PHASES + ["total"]:
+            values = sorted(t[phase] for t in self.timings.values())
+            if not values:
+                continue
+            phases[phase] = {
+                "mean": sum(values) / len(values),
+                "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+                "max": values[-1],
+            }
+        return {
+            "agents": len(self.timings),
+            "ready": len(self.ready),
+            "failed": dict(self.failed),
+            "elapsed": elapsed,
+            "phases": phases,
+        }
+
+    @staticmethod
+    def print_report(report):
+        print(Fore.CYAN + f"[Launcher] {report['ready']}/{report['agents']} agentes prontos em {report['elapsed']:.2f}s" + Style.RESET_ALL)
+        for phase, stats in report["phases"].items():
+            print(f"    {phase:<9} média={stats['mean'] * 1000:.1f}ms p95={stats['p95'] * 1000:.1f}ms máx={stats['max'] * 1000:.1f}ms")
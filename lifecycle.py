@@ -0,0 +1,125 @@
+"""
+lifecycle.py - Controlo global do ciclo de vida da simulação.
+
+Os eventos start / pause / stop são partilhados por todos os agentes do
+processo. Os behaviours esperam por eles (`await lifecycle.wait_started()`)
+em vez de verificar flags a cada segundo, por isso o arranque é imediato e os
+agentes parados não acordam o event loop.
+"""
+import asyncio
+
+
+class Lifecycle:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Estado inicial (não iniciado, não pausado). Usar antes de cada simulação."""
+        self._started = asyncio.Event()
+        self._running = asyncio.Event()  # limpo enquanto está em pausa
+        self._running.set()
+        self._stopped = asyncio.Event()
+
+    @property
+    def started(self):
+        return self._started.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def start(self):
+        self._started.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def stop(self):
+        # Acordar também quem ainda espera pelo início ou pelo fim da pausa
+        self._stopped.set()
+        self._started.set()
+        self._running.set()
+
+    async def wait_started(self):
+        """Espera pelo sinal de início; devolve False se a simulação parou entretanto."""
+        await self._started.wait()
+        return not self.stopped
+
+    async def wait_running(self):
+        """Espera enquanto a simulação está em pausa; devolve False se parou."""
+        await self._running.wait()
+        return not self.stopped
+
+    async def wait_stopped(self):
+        await self._stopped.wait()
+
+    async def receive(self, behaviour, timeout=None):
+        """
+        Como `behaviour.receive(timeout)`, mas sem timeout por omissão: espera
+        pela próxima mensagem e só acorda mais cedo se a simulação ou o agente
+        forem parados. Devolve None nesse caso.
+        """
+        try:
+            return behaviour.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        agent = behaviour.agent
+        if self.stopped or behaviour.is_killed() or agent.is_stopping:
+            return None
+
+        get = asyncio.ensure_future(behaviour.queue.get())
+        stopped = asyncio.ensure_future(self._stopped.wait())
+        agent_stopped = asyncio.ensure_future(agent.stop_event.wait())
+        done, pending = await asyncio.wait([get, stopped, agent_stopped], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        return get.result() if get in done else None
+
+
+lifecycle = Lifecycle()
+
+
+class LifecycleMixin:
+    """
+    Flags dos agentes: `can_start_studying` / `can_start_helping` (o mesmo
+    flag) é só deste agente e é o launcher que o liga; o sinal de início
+    global é `lifecycle.start()`, chamado explicitamente pelo run_agents.
+    `is_stopping` também fica verdadeiro quando a simulação para. Pôr
+    `is_stopping = True` acorda os behaviours do agente que esperam por mensagens.
+    """
+    _stopping = False
+    _stop_event = None
+    _can_start = False
+
+    @property
+    def stop_event(self):
+        if self._stop_event is None:
+            self._stop_event = asyncio.Event()
+        return self._stop_event
+
+    @property
+    def can_start_studying(self):
+        return self._can_start
+
+    @can_start_studying.setter
+    def can_start_studying(self, value):
+        self._can_start = bool(value)
+
+    can_start_helping = can_start_studying
+
+    @property
+    def is_stopping(self):
+        return self._stopping or lifecycle.stopped
+
+    @is_stopping.setter
+    def is_stopping(self, value):
+        self._stopping = value
+        if value:
+            self.stop_event.set()
@@ -0,0 +1,180 @@
+"""
+logs.py - Registo estruturado e assíncrono dos agentes.
+
+Cada agente obtém um `AgentLogger` com `get_logger(nome)`. Os registos levam
+campos próprios (agent, kind, event, color) e vão para uma fila; uma thread
+(QueueListener) formata-os e escreve-os, por isso o ciclo de eventos nunca
+fica à espera do stdout.
+
+* níveis por tipo de agente: `setup(levels={"tutor": "WARNING"})`;
+* eventos repetitivos (com `event=`) limitados a `burst` registos por
+  segundo e por agente; os restantes são contados (por tipo e evento) e
+  descartados. Cada agente tem a sua janela: um estudante muito ativo não
+  cala os outros;
+* cores só quando a saída é um terminal;
+* opcionalmente, uma linha JSON por registo num ficheiro (`json_path`).
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+import time
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from colorama import Fore, Style
+
+ROOT = "isia"
+KINDS = ("student", "tutor", "peer", "resource")
+
+# Cor por omissão dos níveis sem cor explícita
+LEVEL_COLORS = {
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Fore.RED,
+}
+
+_listener = None
+_rate_filter = None
+_stream = None
+
+
+def agent_kind(name):
+    """'student12' -> 'student'; nomes desconhecidos ficam como estão."""
+    kind = name.split("@")[0].rstrip("0123456789")
+    return kind if kind in KINDS else "agent"
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Deixa passar no máximo `burst` registos de cada (agente, evento) por janela de `period` s.
+    Os descartados são contados por (tipo, evento), para o relatório final.
+    """
+
+    def __init__(self, burst=20, period=1.0):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self._windows = {}  # (agente, evento) -> [início da janela, registos]
+        self.suppressed = Counter()
+
+    def filter(self, record):
+        event = getattr(record, "event", None)
+        if event is None or not self.burst:
+            return True
+        key = (getattr(record, "agent", None), event)
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.period:
+            window = self._windows[key] = [now, 0]
+        window[1] += 1
+        if window[1] <= self.burst:
+            return True
+        self.suppressed[(getattr(record, "kind", None), event)] += 1
+        return False
+
+
+class ConsoleFormatter(logging.Formatter):
+    """'[agente] mensagem', com a cor do registo se `color` estiver ligado."""
+
+    def __init__(self, color=False):
+        super().__init__()
+        self.color = color
+
+    def format(self, record):
+        text = f"[{getattr(record, 'agent', record.name)}] {record.getMessage()}"
+        if not self.color:
+            return text
+        color = getattr(record, "color", None) or LEVEL_COLORS.get(record.levelno)
+        return color + text + Style.RESET_ALL if color else text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            "ts": record.created,
+            "level": record.levelname,
+            "kind": getattr(record, "kind", None),
+            "agent": getattr(record, "agent", None),
+            "event": getattr(record, "event", None),
+            "msg": record.getMessage(),
+        }, ensure_ascii=False)
+
+
+class AgentLogger(logging.LoggerAdapter):
+    """Logger de um agente: aceita `color=` (Fore.*) e `event=` (chave de rate limiting)."""
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {
+            "agent": self.extra["agent"],
+            "kind": self.extra["kind"],
+            "color": kwargs.pop("color", None),
+            "event": kwargs.pop("event", None),
+        }
+        return msg, kwargs
+
+
+def setup(level="INFO", levels=None, stream=None, color=None, json_path=None, burst=20, period=1.0):
+    """(Re)configura o registo. Sem chamada explícita, o primeiro get_logger usa os valores por omissão."""
+    global _listener, _rate_filter, _stream
+    shutdown()
+
+    _stream = stream or sys.stdout
+    if color is None:
+        color = hasattr(_stream, "isatty") and _stream.isatty()
+    console = logging.StreamHandler(_stream)
+    console.setFormatter(ConsoleFormatter(color))
+    handlers = [console]
+    if json_path:
+        structured = logging.FileHandler(json_path, encoding="utf-8")
+        structured.setFormatter(JsonFormatter())
+        handlers.append(structured)
+
+    # O filtro corre no agente, antes de entrar na fila: o que é descartado não custa a escrita
+    records = queue.SimpleQueue()
+    handler = QueueHandler(records)
+    _rate_filter = RateLimitFilter(burst, period)
+    handler.addFilter(_rate_filter)
+
+    root = logging.getLogger(ROOT)
+    root.handlers = [handler]
+    root.setLevel(level)
+    root.propagate = False
+    for kind in KINDS:
+        logging.getLogger(f"{ROOT}.{kind}").setLevel((levels or {}).get(kind, logging.NOTSET))
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def flush():
+    """Espera que todos os registos em fila sejam escritos."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def shutdown():
+    """Escreve o que falta, fecha os handlers e reporta os registos descartados."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+    _listener = None
+    if _rate_filter.suppressed:
+        total = sum(_rate_filter.suppressed.values())
+        events = ", ".join(f"{kind}.{event}={n}" for (kind, event), n in _rate_filter.suppressed.most_common(5))
+        print(f"[Logs] {total} registos repetitivos descartados ({events})", file=_stream)
+
+
+def get_logger(name):
+    if _listener is None:
+        setup()
+    kind = agent_kind(name)
+    return AgentLogger(logging.getLogger(f"{ROOT}.{kind}"), {"agent": name, "kind": kind})
+
+
+atexit.register(shutdown)
@@ -1,82 +1,152 @@
 import asyncio
+import os
 import random
 from student import StudentAgent
 from tutor import TutorAgent
 from peer import PeerAgent
 from resource_manager import ResourceManagerAgent
+from transport import LocalBus
+from launcher import AgentLauncher
+import roster
+from clock import VirtualClock
+import clock
+from lifecycle import lifecycle
+from instrumentation import instrumentation
+from tracing import tracer
+import logs
 
-async def main():
-    # Criar agentes
-    number_students = 10
-    number_tutors = 3
-    number_peers = 1
+DISCIPLINES = [
+    "estatística bayesiana",
+    "aprendizagem automática",
+    "programação",
+    "estatística",
+    "português",
+    "álgebra"
+]
+LEARNING_STYLES = ["visual", "auditory", "cinestésico", "kinesthetic"]
+# Catálogo de recursos (JSON ou SQLite); sem ficheiro o Resource Manager gera recomendações genéricas
+RESOURCE_CATALOG = "resources.json"
 
-    disciplines = [
-                    "estatística bayesiana", 
-                    "aprendizagem automática", 
-                    "programação", 
-                    "estatística", 
-                    "português", 
-                    "álgebra"
-                ]
-    learning_styles = ["visual", "auditory", "cinestésico", "kinesthetic"]
-    
-    agents = {
-        "resource": ResourceManagerAgent("resource@localhost", "1234"),
-    }
 
-    for i in range(1, number_students + 1):
-        agents.update({f"student{i}": StudentAgent(f"student{i}@localhost", "1234", learning_style=random.choice(learning_styles))})
+def create_agents(number_students, number_tutors, number_peers, first_id=1, resource=True, workers=4):
+    """Cria a população; `first_id` numera os agentes (ex.: cada shard tem a sua gama)."""
+    agents = {}
+    if resource:
+        catalog = RESOURCE_CATALOG if os.path.exists(RESOURCE_CATALOG) else None
+        agents["resource"] = ResourceManagerAgent("resource@localhost", "1234", catalog=catalog, workers=workers)
+
+    for i in range(first_id, first_id + number_students):
+        agents.update({f"student{i}": StudentAgent(f"student{i}@localhost", "1234", learning_style=random.choice(LEARNING_STYLES))})
 
     print(f"\nStudents created")
-    for i in range(1, number_tutors + 1):
+    for i in range(first_id, first_id + number_tutors):
         random.seed()
         cap = round(random.uniform(1, 3))
-        agents.update({f"tutor{i}": TutorAgent(f"tutor{i}@localhost", "1234", discipline=random.choice(disciplines), expertise=random.uniform(0.5, 1), capacity=cap)})
+        agents.update({f"tutor{i}": TutorAgent(f"tutor{i}@localhost", "1234", discipline=random.choice(DISCIPLINES), expertise=random.uniform(0.5, 1), capacity=cap)})
     print(f"\nTutors created")
 
-    for i in range(1, number_peers + 1):
+    for i in range(first_id, first_id + number_peers):
         agents.update({f"peer{i}": PeerAgent(f"peer{i}@localhost", "1234")})
-    
+
     print(f"\nCreated {number_students} students, {number_tutors} tutors and {number_peers} peers.\n")
-    
-    # Start agents
-    for name, agent in agents.items():
-        await agent.start(auto_register=True)
+    return agents
 
-    await asyncio.sleep(1)
 
-    # Fazer subscrições centralmente: estudantes subscrevem a todos os não-estudantes
-    for name, agent in agents.items():
-        if name.startswith("student"):
-            for n, a in agents.items():
-                if n.startswith("student"):
-                    continue
-                agent.presence.subscribe(a.jid)
-                print(f"[{agent.name}] 🔔 Subscribed to {a.jid}")
-        else:
-            if name.startswith("resource"):
-                continue
-            if "resource" in agents and agent.jid != agents["resource"].jid:
-                agent.presence.subscribe(agents["resource"].jid)
-                print(f"[{agent.name}] 🔔 Subscribed to {agents['resource'].jid}")
+async def run_agents(agents, bus=None, duration=30, concurrency=50, provision=True):
+    """
+    Arranca os agentes, corre a simulação durante `duration` s e para-os. Devolve False se não arrancaram.
+    provision=False: o roster XMPP já foi escrito no server.db (ex.: pelo processo pai dos shards).
+    """
+    # Uma simulação anterior no mesmo processo deixou o ciclo de vida parado
+    if lifecycle.stopped:
+        lifecycle.reset()
+    # Contactos em bloco: no XMPP o roster tem de estar no server.db antes da ligação
+    if not bus and provision:
+        roster.provision(agents)
+        await roster.check(agents)
+
+    # Start agents (em paralelo, com barreira de prontidão)
+    launcher = AgentLauncher(bus=bus, concurrency=concurrency)
+    await launcher.start_all(agents)
+
+    if bus:
+        roster.provision(agents, bus=bus)
+
+    try:
+        launcher.release(agents)
+    except RuntimeError as e:
+        print(f"\n❌ {e}. Shutting down agents...\n")
+        await launcher.stop_all(agents)
+        return False
+    # Sinal de início global (todos os agentes estão prontos e autorizados)
+    lifecycle.start()
 
     print("\n✅ All agents started. Simulation running...\n")
 
     # Tempo da simulação
-    await asyncio.sleep(30)
+    await clock.sleep(duration)
 
+    logs.flush()
     print("\n⏳ Simulation ended. Shutting down agents...\n")
 
     # Stop agents
     for name, agent in agents.items():
-        print(f"🔻 Stopping {name}...")
         if name.startswith("student"):
-            print(f"Final Progress: {agent.initial_progress} -> {agent.progress}")
-        await agent.stop()
+            print(f"Final Progress {name}: {agent.initial_progress} -> {agent.progress}")
+    elapsed = await launcher.stop_all(agents)
+    logs.flush()
+
+    print(f"\n✅ All agents terminated in {elapsed:.2f}s. System shutdown.\n")
+    return True
+
+
+async def main(transport="xmpp", virtual_time=False, concurrency=50, instrument=False, metrics_port=None,
+               log_level="INFO", log_json=None, workers=4):
+    if transport == "xmpp" and virtual_time:
+        raise ValueError("O relógio virtual só funciona com transport=local (o XMPP usa o tempo real do servidor)")
+    if workers < 1:
+        raise ValueError(f"--workers tem de ser >= 1 (recebido: {workers})")
+    # Criar agentes
+    number_students = 10
+    number_tutors = 3
+    number_peers = 1
+
+    # "xmpp" usa o servidor SPADE; "local" entrega as mensagens em memória
+    bus = LocalBus() if transport == "local" else None
+    # Tempo simulado: os atrasos passam a ser eventos num relógio virtual
+    if virtual_time:
+        clock.set_clock(VirtualClock())
+    lifecycle.reset()
+    tracer.reset()
+    logs.setup(level=log_level, json_path=log_json)
+
+    # Instrumentação por behaviour (desligada por omissão: sem custo)
+    server = None
+    if instrument or metrics_port:
+        instrumentation.enable()
+        if metrics_port:
+            server = await instrumentation.serve(port=metrics_port)
+
+    agents = create_agents(number_students, number_tutors, number_peers, workers=workers)
+    await run_agents(agents, bus=bus, concurrency=concurrency)
 
-    print("\n✅ All agents terminated. System shutdown.\n")
+    # Latências por etapa do protocolo, por tópico
+    tracer.print_summary()
+    if instrumentation.enabled:
+        instrumentation.print_summary()
+    if server:
+        server.close()
+    logs.shutdown()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    import sys
+    asyncio.run(main(
+        transport=sys.argv[1] if len(sys.argv) > 1 else "xmpp",
+        virtual_time="--virtual" in sys.argv,
+        instrument="--instrument" in sys.argv,
+        metrics_port=int(sys.argv[sys.argv.index("--metrics-port") + 1]) if "--metrics-port" in sys.argv else None,
+        log_level=sys.argv[sys.argv.index("--log-level") + 1] if "--log-level" in sys.argv else "INFO",
+        log_json=sys.argv[sys.argv.index("--log-json") + 1] if "--log-json" in sys.argv else None,
+        workers=int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else 4
+    ))
     
@@ -1,35 +1,138 @@
+import atexit
 import csv
-from datetime import datetime
+import threading
+import clock
+
+HEADER = [
+    "timestamp",
+    "student",
+    "tutor",
+    "topic",
+    "general_progress",
+    "response_time",
+    "proposals_received",
+    "chosen_tutor",
+    "rejected_count",
+    "peer_used"
+]
+
+
+class CsvSink:
+    def __init__(self, filename):
+        self.filename = filename
+        with open(self.filename, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(HEADER)
+
+    def write(self, rows):
+        with open(self.filename, mode="a", newline="", encoding="utf-8") as file:
+            csv.writer(file).writerows(rows)
+
+
+def merge_csv(paths, filename):
+    """Junta vários CSV de métricas (ex.: um por shard) num só; devolve o nº de linhas."""
+    sink = CsvSink(filename)
+    total = 0
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader, None)  # cabeçalho
+            rows = list(reader)
+        sink.write(rows)
+        total += len(rows)
+    return total
+
 
 class MetricsLogger:
-    def __init__(self, filename="metrics.csv"):
+    """
+    Sink de métricas. As linhas ficam num buffer em memória e são escritas em
+    lote por uma thread de fundo (por tamanho ou por intervalo), por isso
+    `log()` não faz I/O no event loop.
+
+    backend="csv" escreve `filename` em CSV UTF-8; backend="columnar" escreve
+    chunks tipados no diretório `filename` (ver metrics_store.py).
+    """
+
+    def __init__(self, filename="metrics.csv", backend="csv", batch_size=256, flush_interval=1.0):
         self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
 
-        with open(self.filename, mode="w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                "timestamp",
-                "student",
-                "tutor",
-                "topic",
-                "response_time",
-                "proposals_received",
-                "chosen_tutor",
-                "rejected_count",
-                "peer_used"
-            ])
-
-    def log(self, student, tutor, topic, response_time, proposals_received, chosen_tutor, rejected_count, peer_used):
-        with open(self.filename, mode="a", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                datetime.now(),
-                student,
-                tutor,
-                topic,
-                response_time,
-                proposals_received,
-                chosen_tutor,
-                rejected_count,
-                peer_used
-            ])
+        if backend == "csv":
+            self._sink = CsvSink(filename)
+        elif backend == "columnar":
+            from metrics_store import ColumnarSink
+            self._sink = ColumnarSink(filename)
+        else:
+            raise ValueError(f"Backend de métricas desconhecido: {backend}")
+
+        self._thread = threading.Thread(target=self._run, name=f"metrics-{filename}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, student, tutor, topic, general_progress, response_time, proposals_received, chosen_tutor, rejected_count, peer_used):
+        row = [
+            clock.now(),
+            student,
+            tutor,
+            topic,
+            general_progress,
+            response_time,
+            proposals_received,
+            chosen_tutor,
+            rejected_count,
+            peer_used
+        ]
+        with self._buffer_lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Escreve no ficheiro todas as linhas pendentes."""
+        with self._write_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            self._sink.write(rows)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+_defaults = {"filename": "metrics.csv", "backend": "csv"}
+
+
+def set_default_metrics(filename, backend="csv"):
+    """Destino usado por get_metrics_logger() sem argumentos (ex.: pelos estudantes)."""
+    _defaults.update(filename=filename, backend=backend)
+
+
+def get_metrics_logger(filename=None, backend=None):
+    """MetricsLogger único por ficheiro no processo (o ficheiro só é truncado uma vez)."""
+    filename = filename or _defaults["filename"]
+    backend = backend or _defaults["backend"]
+    with _shared_lock:
+        if filename not in _shared:
+            _shared[filename] = MetricsLogger(filename, backend=backend)
+        return _shared[filename]
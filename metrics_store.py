@@ -0,0 +1,153 @@
+"""
+metrics_store.py - Armazenamento colunar das métricas e API de consulta.
+
+Cada flush do MetricsLogger escreve um chunk `.npz` com uma entrada por coluna.
+As colunas de texto são codificadas por dicionário: códigos int32 + vocabulário
+em bytes UTF-8 (o encoding está fixado no schema.json). Como o `.npz` é lido
+coluna a coluna, as consultas só carregam as colunas de que precisam.
+"""
+import glob
+import json
+import os
+import shutil
+import numpy as np
+
+SCHEMA_VERSION = 1
+ENCODING = "utf-8"
+
+# (coluna, tipo) — "str" significa texto codificado por dicionário
+SCHEMA = [
+    ("timestamp", "datetime64[us]"),
+    ("student", "str"),
+    ("tutor", "str"),
+    ("topic", "str"),
+    ("general_progress", "float64"),
+    ("response_time", "float64"),
+    ("proposals_received", "int32"),
+    ("chosen_tutor", "str"),
+    ("rejected_count", "int32"),
+    ("peer_used", "bool"),
+]
+COLUMNS = [name for name, _ in SCHEMA]
+TYPES = dict(SCHEMA)
+
+
+class ColumnarSink:
+    """Escreve lotes de linhas (na ordem de SCHEMA) como chunks colunares."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        for old in glob.glob(os.path.join(path, "chunk-*.npz")):
+            os.remove(old)
+        with open(os.path.join(path, "schema.json"), "w", encoding=ENCODING) as file:
+            json.dump({"version": SCHEMA_VERSION, "encoding": ENCODING, "columns": SCHEMA}, file, indent=2)
+        self._chunks = 0
+
+    def write(self, rows):
+        self.write_columns(dict(zip(COLUMNS, zip(*rows))))
+
+    def write_columns(self, columns):
+        """Escreve um chunk a partir de {coluna: sequência/array}."""
+        arrays = {}
+        for name, kind in SCHEMA:
+            values = columns[name]
+            if kind == "str":
+                vocab, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+                arrays[f"{name}.codes"] = codes.reshape(-1).astype(np.int32)
+                arrays[f"{name}.vocab"] = np.array([v.encode(ENCODING) for v in vocab.tolist()], dtype=bytes)
+            else:
+                arrays[name] = np.asarray(values, dtype=kind)
+        self._chunks += 1
+        np.savez(os.path.join(self.path, f"chunk-{self._chunks:06d}.npz"), **arrays)
+
+
+def merge(paths, out):
+    """Junta vários diretórios colunares (ex.: um por shard) em `out`; devolve o nº de chunks."""
+    sink = ColumnarSink(out)
+    for path in paths:
+        for chunk in sorted(glob.glob(os.path.join(path, "chunk-*.npz"))):
+            sink._chunks += 1
+            shutil.copyfile(chunk, os.path.join(out, f"chunk-{sink._chunks:06d}.npz"))
+    return sink._chunks
+
+
+class MetricsQuery:
+    """Consultas sobre um diretório de métricas colunares."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "schema.json"), encoding=ENCODING) as file:
+            schema = json.load(file)
+        if schema["version"] != SCHEMA_VERSION:
+            raise ValueError(f"Versão de schema não suportada: {schema['version']}")
+        self.types = dict((name, kind) for name, kind in schema["columns"])
+        self.encoding = schema["encoding"]
+        self.chunks = sorted(glob.glob(os.path.join(path, "chunk-*.npz")))
+
+    def _read(self, chunk, name):
+        """Lê uma coluna de um chunk; para texto devolve (códigos, vocabulário)."""
+        if self.types[name] == "str":
+            vocab = [v.decode(self.encoding) for v in chunk[f"{name}.vocab"]]
+            return chunk[f"{name}.codes"], vocab
+        return chunk[name], None
+
+    def _mask(self, chunk, filters):
+        mask = None
+        for name, wanted in filters.items():
+            if wanted is None:
+                continue
+            values, vocab = self._read(chunk, name)
+            if vocab is not None:
+                # Comparar códigos sem descodificar a coluna
+                if wanted not in vocab:
+                    return np.zeros(len(values), dtype=bool)
+                hit = values == vocab.index(wanted)
+            else:
+                hit = values == wanted
+            mask = hit if mask is None else mask & hit
+        return mask
+
+    def select(self, columns, **filters):
+        """Devolve {coluna: array} das linhas que cumprem os filtros (ex.: student="student1")."""
+        for name in list(columns) + list(filters):
+            if name not in self.types:
+                raise KeyError(f"Coluna desconhecida: {name}")
+        parts = {name: [] for name in columns}
+        for path in self.chunks:
+            with np.load(path) as chunk:
+                mask = self._mask(chunk, filters)
+                for name in columns:
+                    values, vocab = self._read(chunk, name)
+                    if mask is not None:
+                        values = values[mask]
+                    if vocab is not None:
+                        values = np.array(vocab, dtype=object)[values] if len(values) else np.array([], dtype=object)
+                    parts[name].append(values)
+        return {
+            name: np.concatenate(chunks) if chunks else np.array([])
+            for name, chunks in parts.items()
+        }
+
+    def aggregate(self, column, by=None, **filters):
+        """Estatísticas de uma coluna numérica, globais ou agrupadas por `by`."""
+        wanted = [column] + ([by] if by else [])
+        data = self.select(wanted, **filters)
+        values = data[column].astype(float)
+        if by is None:
+            return _summary(values)
+        keys = data[by]
+        return {key: _summary(values[keys == key]) for key in sorted(set(keys))}
+
+
+def _summary(values):
+    if len(values) == 0:
+        return {"count": 0}
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+    }
@@ -1,32 +1,39 @@
 from spade.agent import Agent
 from spade.message import Message
+from spade.template import Template
 from spade.behaviour import *
 from spade.presence import *
 import asyncio
-from colorama import Fore, Style
+from colorama import Fore
+import clock
+import codec
+from logs import get_logger
+from lifecycle import lifecycle, LifecycleMixin
 
-class PeerAgent(Agent):
+class PeerAgent(LifecycleMixin, Agent):
     def __init__(self, jid, password):
         super().__init__(jid, password)
+        self.log = get_logger(self.name)
         self.can_start_helping = False  # Flag to control start
         self.is_stopping = False  # Flag to stop behaviours
     
     async def setup(self):
-        print(Fore.MAGENTA + f"[Peer-{self.name}] Started - Ready to help students" + Style.RESET_ALL)
+        self.log.info("Started - Ready to help students", color=Fore.MAGENTA, event="setup")
         self.add_behaviour(self.HelpPeers())
-        self.add_behaviour(self.Subcreption())
+        # Nenhuma mensagem tem este metadata: o Subcreption não lê a caixa de correio
+        self.add_behaviour(self.Subcreption(), Template(metadata={"peer": "internal"}))
 
     class Subcreption(OneShotBehaviour):
         def on_available(self, peer_jid, presence_info, last_presence):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} is {presence_info.show.value}")
+            self.agent.log.debug("Agent %s is %s", peer_jid.split("@")[0], presence_info.show.value, event="presence")
 
         def on_subscribed(self, peer_jid):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} has accepted the subscription")
+            self.agent.log.debug("Agent %s has accepted the subscription", peer_jid.split("@")[0], event="presence")
             contacts = self.agent.presence.get_contacts()
-            print(f"[{self.agent.name}] Contacts List: {contacts}")
+            self.agent.log.debug("Contacts List: %s", contacts, event="presence")
 
         def on_subscribe(self, peer_jid):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} asked for subscription. Let's approve it")
+            self.agent.log.debug("Agent %s asked for subscription. Let's approve it", peer_jid.split("@")[0], event="presence")
             self.presence.approve_subscription(peer_jid)
             self.presence.subscribe(peer_jid)
 
@@ -42,22 +49,18 @@ class PeerAgent(Agent):
             
     class HelpPeers(CyclicBehaviour):
         async def run(self):
-            # 🔴 CHECK IF STOPPING
-            if self.agent.is_stopping:
+            # 🔴 WAIT UNTIL ALL AGENTS ARE READY (and not paused)
+            if not await lifecycle.wait_started() or not await lifecycle.wait_running() or self.agent.is_stopping:
+                self.kill()
                 return
             
-            # 🔴 WAIT UNTIL ALL AGENTS ARE READY
-            if not self.agent.can_start_helping:
-                await asyncio.sleep(1)
-                return
-            
-            msg = await self.receive(timeout=5)
+            msg = await lifecycle.receive(self)
             if msg and msg.get_metadata("performative") == "peer-help":
-                print(Fore.MAGENTA + f"[Peer-{self.agent.name}] ✅ Helping {msg.sender}" + Style.RESET_ALL)
+                self.agent.log.info("✅ Helping %s", msg.sender, color=Fore.MAGENTA, event="help")
 
-                await asyncio.sleep(1)
+                await clock.sleep(1)
 
-                reply = Message(to=str(msg.sender))
+                reply = Message(to=str(msg.sender), thread=msg.thread)
                 reply.set_metadata("performative", "inform")
-                reply.body = "explanation:Peer help sent ✅"
+                reply.body = codec.encode(codec.Explanation("Peer help sent ✅"))
                 await self.send(reply)
@@ -1,48 +1,196 @@
 from spade.agent import Agent
 from spade.message import Message
 from spade import behaviour
-from colorama import Fore, Style
-import random
+from spade.template import Template
+from colorama import Fore
+from collections import deque
+import time
+import codec
+from logs import get_logger
+from lifecycle import lifecycle, LifecycleMixin
+from cache import RecommendationCache
+from catalog import ResourceCatalog
 
-class ResourceManagerAgent(Agent):
-    def __init__(self, jid, password):
+# Estilo pedido -> estilo normalizado dos recursos
+STYLE_MAP = {
+    "visual": "visual",
+    "auditory": "auditory",
+    "cinestésico": "kinesthetic",
+    "kinesthetic": "kinesthetic"
+}
+
+
+# Com catálogo, o conhecimento no tópico é arredondado a 1/LEVEL_BUCKETS
+LEVEL_BUCKETS = 20
+
+
+def level(progress):
+    return "intro" if progress < 0.5 else "advanced"
+
+
+class ResourceManagerAgent(LifecycleMixin, Agent):
+    def __init__(self, jid, password, catalog=None, cache_size=1024, cache_ttl=300.0, workers=4, max_batch=256):
+        # Os pedidos são repartidos por hash(chave) % workers: é preciso pelo menos um
+        if workers < 1:
+            raise ValueError(f"workers tem de ser >= 1 (recebido: {workers})")
         super().__init__(jid, password)
+        self.log = get_logger(self.name)
         self.is_stopping = False  # Flag para parar behaviours
+        self.num_workers = workers
+        self.max_batch = max_batch  # Máximo de pedidos retirados da mailbox por acordar
+        self.workers = []
+        self.in_workers = 0  # pedidos entregues aos workers e ainda não tratados
+        self.batches = 0
+        self.requests = 0
+        self.max_batch_seen = 0
+        self.batch_latencies = deque(maxlen=1000)  # segundos, últimos lotes
+        self.catalog_version = 0
+        # Recomendações por (tópico, estilo normalizado, nível)
+        self.cache = RecommendationCache(maxsize=cache_size, ttl=cache_ttl, version=self.catalog_version)
+        self.catalog = None
+        if catalog is not None:
+            self.load_catalog(catalog)
+
+    def load_catalog(self, catalog):
+        """Usa um ResourceCatalog (ou carrega-o de um ficheiro JSON/SQLite)."""
+        if isinstance(catalog, str):
+            catalog = ResourceCatalog.load(catalog)
+        self.catalog = catalog
+        self.catalog_changed()
+        self.log.info("📚 Catálogo com %d recursos", len(catalog), color=Fore.CYAN)
+
+    def catalog_changed(self):
+        """Chamar quando o catálogo de recursos muda: invalida as recomendações em cache."""
+        self.catalog_version += 1
+        self.cache.invalidate(self.catalog_version)
+
+    def recommendation_key(self, topic, style, progress, knowledge=None):
+        """(tópico, estilo normalizado, nível): pedidos com a mesma chave têm a mesma recomendação."""
+        style = STYLE_MAP.get(style, "visual")
+        if self.catalog is not None:
+            bucket = round((progress if knowledge is None else knowledge) * LEVEL_BUCKETS)
+        else:
+            bucket = level(progress)
+        return (topic, style, bucket)
+
+    def recommend(self, topic, style, progress, knowledge=None):
+        key = self.recommendation_key(topic, style, progress, knowledge)
+        resource = self.cache.get(key, self.catalog_version)
+        if resource is None:
+            resource = self.build_recommendation(*key)
+            self.cache.put(key, resource)
+        return resource
+
+    def build_recommendation(self, topic, style, level):
+        if self.catalog is not None:
+            best = self.catalog.top_k(topic, style, level / LEVEL_BUCKETS, k=1)
+            if best:
+                return best[0].title
+            level = "intro" if level < LEVEL_BUCKETS / 2 else "advanced"
+        if level == "intro":
+            return f"Introductory video {style} about {topic}"
+        return f"Advanced exercise {style} on the {topic}"
     
+    def queue_depth(self):
+        """Pedidos à espera: na mailbox do dispatcher e nas filas dos workers."""
+        waiting = self.dispatcher.queue.qsize() if getattr(self, "dispatcher", None) else 0
+        return waiting + self.in_workers
+
+    def batch_stats(self):
+        latencies = sorted(self.batch_latencies)
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch": self.requests / self.batches if self.batches else 0.0,
+            "max_batch": self.max_batch_seen,
+            "queue_depth": self.queue_depth(),
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
     class ResourceBehaviour(behaviour.CyclicBehaviour):
+        """Dispatcher: esvazia a mailbox a cada acordar, descodifica o lote e reparte-o pelos workers."""
         async def run(self):
             if self.agent.is_stopping:
+                self.kill()
                 return
-            
-            random.seed()
-            msg = await self.receive(timeout=10)
+
+            msg = await lifecycle.receive(self)
             if not msg:
                 return
 
-            parts = dict(p.split(":") for p in msg.body.split(";"))
-            topic = parts.get("topic", "unknown")
-            progress = float(parts.get("progress", 0))
-            
-            style_map = {
-                "visual": "visual",
-                "auditory": "auditory",
-                "cinestésico": "kinesthetic",
-                "kinesthetic": "kinesthetic"
-            }
-            style = style_map.get(parts.get("style", ""), "visual")
-
-            if progress < 0.5:
-                resource = f"Introductory video {style} about {topic}"
-            else:
-                resource = f"Advanced exercise {style} on the {topic}"
-
-            resp = Message(to=str(msg.sender))
-            resp.body = f"resource:{resource}"
-            resp.metadata["performative"] = "resource-recommendation"
-            await self.send(resp)
-
-            print(Fore.YELLOW + f"[Resource] resource asset sent → {msg.sender}: {resource}")
+            batch = [msg]
+            while len(batch) < self.agent.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            # Partição pela chave da recomendação: pedidos iguais vão sempre para o
+            # mesmo worker, que a calcula uma só vez (e nunca dois workers em paralelo)
+            workers = self.agent.workers
+            received = time.perf_counter()
+            parts = [[] for _ in workers]
+            for msg in batch:
+                try:
+                    request = codec.decode(msg.body, codec.HelpRequest)
+                except codec.CodecError as e:
+                    self.agent.log.warning("⚠️ Pedido inválido de %s: %s", msg.sender, e, event="invalid")
+                    continue
+                key = self.agent.recommendation_key(request.topic, request.style, request.progress, request.knowledge)
+                parts[hash(key) % len(workers)].append((msg, request, key))
+            for worker, part in zip(workers, parts):
+                if part:
+                    self.agent.in_workers += len(part)
+                    worker.queue.put_nowait((received, part))
+
+    class Worker(behaviour.CyclicBehaviour):
+        """Trata os lotes entregues pelo dispatcher (o template não aceita mensagens do exterior)."""
+        async def run(self):
+            if self.agent.is_stopping:
+                self.kill()
+                return
+
+            job = await lifecycle.receive(self)
+            if not job:
+                return
+            received, batch = job
+
+            agent = self.agent
+            try:
+                # Cada recomendação distinta do lote é calculada uma só vez
+                bodies = {}
+                for msg, request, key in batch:
+                    if key not in bodies:
+                        resource = agent.recommend(request.topic, request.style, request.progress, request.knowledge)
+                        bodies[key] = (resource, codec.encode(codec.ResourceRecommendation(resource)))
+                    resource, body = bodies[key]
+
+                    resp = Message(to=str(msg.sender), thread=msg.thread)
+                    resp.body = body
+                    resp.set_metadata("performative", "resource-recommendation")
+                    await self.send(resp)
+
+                    agent.log.debug("resource asset sent → %s: %s", msg.sender, resource, color=Fore.YELLOW, event="sent")
+            finally:
+                # Mesmo com erro ou cancelamento, o lote deixa de contar na fila
+                agent.in_workers -= len(batch)
+            agent.batches += 1
+            agent.requests += len(batch)
+            agent.max_batch_seen = max(agent.max_batch_seen, len(batch))
+            agent.batch_latencies.append(time.perf_counter() - received)
 
     async def setup(self):
-        print("Resource Manager active.")
-        self.add_behaviour(self.ResourceBehaviour())
+        self.log.info("Resource Manager active.")
+        self.dispatcher = self.ResourceBehaviour()
+        self.add_behaviour(self.dispatcher)
+        # Nenhuma mensagem tem este metadata: os workers só recebem trabalho do dispatcher
+        self.workers = [self.Worker() for _ in range(self.num_workers)]
+        for worker in self.workers:
+            self.add_behaviour(worker, Template(metadata={"resource-worker": "internal"}))
+
+    async def stop(self):
+        await super().stop()
+        await self.teardown()
+
+    async def teardown(self):
+        self.log.info("cache: %s", self.cache.stats(), color=Fore.YELLOW)
+        self.log.info("lotes: %s", self.batch_stats(), color=Fore.YELLOW)
@@ -0,0 +1,160 @@
+"""
+roster.py - Provisionamento em bloco dos contactos (rosters) dos agentes.
+
+Em vez de cada estudante subscrever cada tutor/peer (e esperar pelos
+subscribe/subscribed de volta), a topologia é calculada de uma vez e escrita
+diretamente:
+
+* LocalBus: `bus.provision(pairs)` liga os contactos em memória;
+* XMPP: as entradas vão para a tabela `roster` do server.db do servidor local
+  (pyjabber) com um único executemany, ANTES de os agentes se ligarem.
+
+O pyjabber guarda o roster de cada utilizador local com `jid.user` como dono
+("student1", não "student1@localhost") e só relê a tabela para a cache em
+memória em `Roster._update_roster`; por isso as linhas têm de existir antes do
+primeiro pedido de roster. `verify_server_db` relê-as através do próprio
+pyjabber para confirmar que o servidor as vê.
+"""
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from colorama import Fore, Style
+
+ROSTER_NS = "jabber:iq:roster"
+
+
+def owner_key(jid):
+    """Dono da linha como o pyjabber o procura: a parte `user` do JID ('student1@localhost' -> 'student1')."""
+    return jid.split("@")[0]
+
+
+def _bare(agent):
+    return agent if isinstance(agent, str) else str(agent.jid.bare)
+
+
+def topology(agents):
+    """
+    Pares (jid, jid) a ligar, como a subscrição feita em main.py: estudantes ↔
+    todos os não-estudantes; tutores/peers ↔ resource manager. `agents` mapeia
+    nome -> agente ou diretamente nome -> JID (ex.: agentes de outro processo).
+    """
+    students = [_bare(a) for name, a in agents.items() if name.startswith("student")]
+    others = [_bare(a) for name, a in agents.items() if not name.startswith("student")]
+    resources = [_bare(a) for name, a in agents.items() if name.startswith("resource")]
+
+    pairs = [(s, o) for s in students for o in others]
+    pairs += [(o, r) for o in others if o not in resources for r in resources]
+    return pairs
+
+
+def roster_item(jid, subscription="both"):
+    """
+    Item de roster serializado (<item xmlns="jabber:iq:roster" .../>), como o
+    pyjabber o lê com ET.fromstring. O contacto fica com o JID nu completo: a
+    presença do pyjabber aceita `user` ou `bare()` e o SPADE recebe JIDs válidos.
+    """
+    item = ET.Element("item", attrib={"xmlns": ROSTER_NS, "jid": jid, "subscription": subscription})
+    return ET.tostring(item, encoding="unicode")
+
+
+def create_schema(db_path):
+    """Cria as tabelas do pyjabber se o servidor ainda não correu (o pyjabber faz o mesmo create_all)."""
+    from sqlalchemy import create_engine
+    from pyjabber.db.model import Model
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        Model.server_metadata.create_all(engine)
+    finally:
+        engine.dispose()
+
+
+def provision_server_db(pairs, db_path="server.db"):
+    """
+    Escreve as entradas de roster dos dois lados de cada par no server.db.
+    As entradas antigas dos mesmos donos são substituídas. Devolve o nº de linhas.
+    """
+    rows = []
+    for a, b in pairs:
+        rows.append((owner_key(a), roster_item(b)))
+        rows.append((owner_key(b), roster_item(a)))
+    owners = sorted({owner for owner, _ in rows})
+
+    create_schema(db_path)
+    with sqlite3.connect(db_path) as db:
+        db.executemany("DELETE FROM roster WHERE jid = ?", [(owner,) for owner in owners])
+        db.executemany("INSERT INTO roster (jid, roster_item) VALUES (?, ?)", rows)
+    return len(rows)
+
+
+async def verify_server_db(pairs, db_path="server.db"):
+    """
+    Relê o roster com o `Roster._update_roster` do pyjabber (a mesma leitura
+    que o servidor faz) e devolve as entradas em falta como [(dono, contacto)].
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from pyjabber.db.database import DB
+    from pyjabber.plugins.roster.Roster import Roster
+
+    previous = DB._engine
+    DB._engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    try:
+        server_roster = Roster()
+        await server_roster._update_roster()
+    finally:
+        await DB._engine.dispose()
+        DB._engine = previous
+
+    cache = server_roster._roster_in_memory
+    contacts = {}
+    for owner, items in cache.items():
+        contacts[owner] = {ET.fromstring(item["item"]).get("jid") for item in items}
+
+    missing = []
+    for a, b in pairs:
+        if b not in contacts.get(owner_key(a), ()):
+            missing.append((a, b))
+        if a not in contacts.get(owner_key(b), ()):
+            missing.append((b, a))
+    return missing
+
+
+def provision(agents, bus=None, db_path="server.db", pairs=None):
+    """
+    Liga todos os agentes numa só passagem; devolve o relatório de tempos.
+    `pairs` substitui a topologia calculada (ex.: a união dos shards).
+    """
+    t0 = time.perf_counter()
+    pairs = topology(agents) if pairs is None else pairs
+    t1 = time.perf_counter()
+    if bus is not None:
+        entries = bus.provision(pairs)
+        target = "LocalBus"
+    else:
+        entries = provision_server_db(pairs, db_path)
+        target = db_path
+    t2 = time.perf_counter()
+
+    report = {
+        "agents": len(agents),
+        "pairs": len(pairs),
+        "entries": entries,
+        "target": target,
+        "topology": t1 - t0,
+        "write": t2 - t1,
+    }
+    print(Fore.CYAN + f"[Roster] {report['pairs']} pares / {report['entries']} entradas em {target}: "
+          f"topologia {report['topology'] * 1000:.1f}ms, escrita {report['write'] * 1000:.1f}ms" + Style.RESET_ALL)
+    return report
+
+
+async def check(agents, db_path="server.db", pairs=None):
+    """Confirma (e reporta) que o pyjabber vê todos os contactos provisionados no server.db."""
+    pairs = topology(agents) if pairs is None else pairs
+    missing = await verify_server_db(pairs, db_path)
+    if missing:
+        print(Fore.RED + f"[Roster] {len(missing)} de {2 * len(pairs)} entradas não são lidas pelo servidor "
+              f"(ex.: {missing[0][0]} -> {missing[0][1]})" + Style.RESET_ALL)
+    else:
+        print(Fore.CYAN + f"[Roster] {2 * len(pairs)} entradas confirmadas no roster do servidor" + Style.RESET_ALL)
+    return missing
@@ -0,0 +1,211 @@
+"""
+sharded_runner.py - Simulação repartida por vários processos (um event loop por core).
+
+A população é dividida em shards. Cada shard corre num processo próprio com
+estudantes, tutores e peers seus (numerados numa gama própria, por isso os JIDs
+não colidem):
+
+* transport="local": cada shard é uma sub-população independente no seu
+  LocalBus, com o seu resource manager; não há mensagens entre processos;
+* transport="xmpp": todos os shards ligam-se ao mesmo servidor, mas cada
+  processo tem o seu diretório de tutores e o seu ciclo de vida (arranque,
+  pausa, paragem). Os shards são sub-populações independentes: os estudantes
+  só pedem ajuda aos tutores e peers do seu shard; só o resource manager (no
+  shard 0) é partilhado, através do servidor. O roster de todos os shards é
+  escrito no server.db uma única vez, pelo processo pai, antes de os lançar.
+
+Partição: estudantes, tutores e peers são repartidos em partes quase iguais
+(`_split`), por isso os tutores de um shard só servem os estudantes desse
+shard. Cada shard tem pelo menos um tutor e um estudante (o nº de shards é
+limitado a min(estudantes, tutores)) e pelo menos um peer (o recurso quando
+nenhum tutor responde): se houver menos peers do que shards, são acrescentados
+os que faltam. A partição usada é mostrada no arranque.
+
+O output de cada shard vai para um ficheiro de log (ou é descartado), e as
+métricas de cada shard são juntadas num único dataset no fim (os ficheiros
+por shard são apagados).
+"""
+import argparse
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from colorama import Fore, Style
+import roster
+
+
+def _split(total, shards):
+    """Reparte `total` em `shards` partes quase iguais."""
+    base, extra = divmod(total, shards)
+    return [base + (1 if k < extra else 0) for k in range(shards)]
+
+
+def _jids(spec):
+    """Nome -> JID dos agentes de um shard (numerados como em create_agents), mais o resource manager partilhado."""
+    jids = {"resource": "resource@localhost"}
+    for kind in ("student", "tutor", "peer"):
+        for i in range(spec["first_id"], spec["first_id"] + spec[kind + "s"]):
+            jids[f"{kind}{i}"] = f"{kind}{i}@localhost"
+    return jids
+
+
+def _shard_metrics(out, shard, backend):
+    root, ext = os.path.splitext(out)
+    return f"{root}.shard{shard}{ext if backend == 'csv' else ''}"
+
+
+async def _run_shard(spec):
+    # Importações aqui: cada processo cria os seus agentes e serviços globais
+    import clock
+    import logs
+    from lifecycle import lifecycle
+    from main import create_agents, run_agents
+    from metrics import get_metrics_logger, set_default_metrics
+    from transport import LocalBus
+
+    set_default_metrics(spec["metrics"], spec["backend"])
+    if spec["virtual_time"]:
+        clock.set_clock(clock.VirtualClock())
+    lifecycle.reset()
+    # Sem ficheiro de log o output iria para /dev/null: nem o formatar
+    logs.setup(level="INFO" if spec["log"] else "WARNING")
+    bus = LocalBus() if spec["transport"] == "local" else None
+
+    agents = create_agents(
+        spec["students"], spec["tutors"], spec["peers"],
+        first_id=spec["first_id"], resource=spec["resource"]
+    )
+    t0 = time.perf_counter()
+    # No XMPP o roster de todos os shards já foi escrito pelo processo pai
+    ok = await run_agents(agents, bus=bus, duration=spec["duration"], concurrency=spec["concurrency"], provision=False)
+    wall = time.perf_counter() - t0
+    get_metrics_logger().close()
+    logs.shutdown()
+
+    students = [a for name, a in agents.items() if name.startswith("student")]
+    return {
+        "shard": spec["shard"],
+        "ok": ok,
+        "agents": len(agents),
+        "students": len(students),
+        "initial_progress": sum(a.initial_progress for a in students) / max(1, len(students)),
+        "final_progress": sum(a.knowledge.progress for a in students) / max(1, len(students)),
+        "delivered": bus.delivered if bus else None,
+        "wall": wall,
+        "metrics": spec["metrics"],
+    }
+
+
+def run_shard(spec):
+    """Ponto de entrada de cada processo do pool."""
+    log = spec["log"] or os.devnull
+    with open(log, "w", encoding="utf-8") as output, contextlib.redirect_stdout(output):
+        return asyncio.run(_run_shard(spec))
+
+
+def run_sharded(students, tutors, peers=1, shards=None, transport="local", virtual_time=False,
+                duration=30, concurrency=50, out="metrics.csv", backend="csv", log_dir=None):
+    """Corre a simulação em `shards` processos e junta as métricas em `out`."""
+    if transport == "xmpp" and virtual_time:
+        raise ValueError("O relógio virtual é por processo: não pode ser usado com shards XMPP")
+    shards = shards or os.cpu_count() or 1
+    # Um shard sem tutores (ou sem estudantes) não tem simulação
+    limit = max(1, min(students, tutors))
+    if shards > limit:
+        print(Fore.YELLOW + f"[Sharded] {shards} shards para {students} estudantes e {tutors} tutores: a usar {limit}" + Style.RESET_ALL)
+        shards = limit
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    # Um shard sem peers deixaria os seus estudantes sem alternativa aos tutores
+    if peers < shards:
+        print(Fore.YELLOW + f"[Sharded] {peers} peers para {shards} shards: a usar {shards} (um por shard)" + Style.RESET_ALL)
+        peers = shards
+
+    specs = []
+    first_id = 1
+    for shard, (s, t, p) in enumerate(zip(_split(students, shards), _split(tutors, shards), _split(peers, shards))):
+        specs.append({
+            "shard": shard,
+            "students": s,
+            "tutors": t,
+            "peers": p,
+            "first_id": first_id,
+            # No XMPP só existe um resource@localhost para todos os shards
+            "resource": transport == "local" or shard == 0,
+            "transport": transport,
+            "virtual_time": virtual_time,
+            "duration": duration,
+            "concurrency": concurrency,
+            "metrics": _shard_metrics(out, shard, backend),
+            "backend": backend,
+            "log": os.path.join(log_dir, f"shard{shard}.log") if log_dir else None,
+        })
+        first_id += max(s, t, p)
+    for spec in specs:
+        print(f"[Sharded] shard {spec['shard']}: {spec['students']} estudantes, {spec['tutors']} tutores, {spec['peers']} peers")
+
+    # XMPP: roster escrito uma só vez, pelo pai (os shards não escrevem no server.db em simultâneo)
+    if transport == "xmpp":
+        jids, pairs = {}, []
+        for spec in specs:
+            shard_jids = _jids(spec)
+            jids.update(shard_jids)
+            pairs += roster.topology(shard_jids)
+        roster.provision(jids, pairs=pairs)
+        asyncio.run(roster.check(jids, pairs=pairs))
+
+    t0 = time.perf_counter()
+    # "spawn": processos limpos, sem herdar o estado (loop, threads) do pai
+    with ProcessPoolExecutor(max_workers=shards, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(run_shard, specs))
+    wall = time.perf_counter() - t0
+
+    paths = [r["metrics"] for r in results]
+    if backend == "columnar":
+        from metrics_store import merge
+        merge(paths, out)
+    else:
+        from metrics import merge_csv
+        merge_csv(paths, out)
+    for path in paths:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+    for r in results:
+        status = Fore.GREEN + "ok" if r["ok"] else Fore.RED + "falhou"
+        print(f"[Shard {r['shard']}] {status}{Style.RESET_ALL} {r['students']} estudantes, "
+              f"progresso {r['initial_progress']:.2f} -> {r['final_progress']:.2f}, {r['wall']:.1f}s")
+    print(Fore.CYAN + f"[Sharded] {students} estudantes em {shards} processos: {wall:.1f}s; métricas em {out}" + Style.RESET_ALL)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação multi-agente repartida por processos")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--tutors", type=int, default=30)
+    parser.add_argument("--peers", type=int, default=4)
+    parser.add_argument("--shards", type=int, default=None, help="nº de processos (por omissão, nº de cores)")
+    parser.add_argument("--transport", choices=["local", "xmpp"], default="local")
+    parser.add_argument("--virtual", action="store_true", help="relógio virtual (só com transport=local)")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--out", default="metrics.csv")
+    parser.add_argument("--backend", choices=["csv", "columnar"], default="csv")
+    parser.add_argument("--log-dir", default=None, help="guardar o output de cada shard")
+    args = parser.parse_args()
+
+    run_sharded(
+        args.students, args.tutors, args.peers, shards=args.shards, transport=args.transport,
+        virtual_time=args.virtual, duration=args.duration, concurrency=args.concurrency,
+        out=args.out, backend=args.backend, log_dir=args.log_dir
+    )
+
+
+if __name__ == "__main__":
+    main()
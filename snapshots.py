@@ -0,0 +1,199 @@
+"""
+snapshots.py - Publicação do estado dos agentes para a interface gráfica.
+
+O `SnapshotPublisher` corre como uma task própria: a um ritmo configurável lê
+o estado de cada agente para registos imutáveis e compactos (StudentRecord,
+TutorRecord, PeerRecord), calcula a diferença para a amostra anterior e põe-na
+num `FrameQueue`. A fila é limitada e nunca bloqueia: se a interface não a
+esvaziar a tempo, os frames por consumir são fundidos num só (os descartados
+são contados).
+
+Do lado da interface, `SnapshotView.apply(frame)` mantém o dicionário
+{nome: dict} que os painéis (`update_status`, `update_metrics`) já consomem.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+
+
+@dataclass(frozen=True, slots=True)
+class StudentRecord:
+    learning_style: str
+    progress: float
+    initial_progress: float
+    topic: str
+
+
+@dataclass(frozen=True, slots=True)
+class TutorRecord:
+    discipline: str
+    expertise: float
+    available_slots: int
+    capacity: int
+    queue: int  # estudantes em espera
+
+
+@dataclass(frozen=True, slots=True)
+class PeerRecord:
+    active: bool
+
+
+def capture(name, agent):
+    """Registo imutável do estado atual de um agente (só leituras, sem await)."""
+    if name.startswith("student"):
+        return StudentRecord(agent.learning_style, agent.knowledge.progress, agent.initial_progress, agent.topic)
+    if name.startswith("tutor"):
+        return TutorRecord(agent.discipline, agent.expertise, agent.available_slots, agent.capacity, len(agent.queue))
+    if name.startswith("peer"):
+        return PeerRecord(not agent.is_stopping)
+    return None
+
+
+@dataclass(frozen=True)
+class Frame:
+    """Diferença entre duas amostras: registos novos/alterados e agentes que saíram."""
+    seq: int
+    time: float
+    changed: dict  # nome -> registo
+    removed: frozenset = frozenset()
+    full: bool = False  # primeira amostra: `changed` tem todos os agentes
+
+    def merge(self, newer):
+        """Um só frame equivalente a aplicar `self` e depois `newer`."""
+        changed = {name: record for name, record in self.changed.items() if name not in newer.removed}
+        changed.update(newer.changed)
+        removed = (self.removed - newer.changed.keys()) | newer.removed
+        return Frame(newer.seq, newer.time, changed, frozenset(removed), self.full or newer.full)
+
+
+class FrameQueue:
+    """Fila limitada entre o publisher e a interface; `put` nunca bloqueia.
+
+    Com a fila cheia, o frame novo é fundido com o último em espera: a
+    interface recebe menos frames, mas nunca perde alterações.
+    """
+
+    def __init__(self, maxsize=2):
+        self.maxsize = maxsize
+        self._frames = deque()
+        self._lock = threading.Lock()  # a interface pode consumir noutra thread
+        self.published = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def put(self, frame):
+        with self._lock:
+            self.published += 1
+            if len(self._frames) >= self.maxsize:
+                self._frames[-1] = self._frames[-1].merge(frame)
+                self.coalesced += 1
+            else:
+                self._frames.append(frame)
+
+    def get_nowait(self):
+        """Próximo frame, ou None se não há nada novo."""
+        with self._lock:
+            return self._frames.popleft() if self._frames else None
+
+    def drain(self):
+        """Todos os frames em espera fundidos num só (ou None)."""
+        with self._lock:
+            if not self._frames:
+                return None
+            frame = self._frames.popleft()
+            while self._frames:
+                frame = frame.merge(self._frames.popleft())
+            return frame
+
+
+class SnapshotPublisher:
+    def __init__(self, agents, rate=4.0, queue=None, chunk=500):
+        self.agents = agents  # dict nome -> agente (o mesmo do main/controller)
+        self.rate = rate  # amostras por segundo
+        self.queue = queue or FrameQueue()
+        self.chunk = chunk  # agentes lidos entre cedências ao ciclo de eventos
+        self.records = {}  # última amostra publicada
+        self.seq = 0
+        self.sample_time = 0.0  # duração da última amostra (s)
+        self._task = None
+
+    async def sample(self):
+        """Lê todos os agentes, cedendo o ciclo a cada `chunk` para não atrasar os behaviours."""
+        t0 = time.perf_counter()
+        records = {}
+        for i, (name, agent) in enumerate(list(self.agents.items()), 1):
+            record = capture(name, agent)
+            if record is not None:
+                records[name] = record
+            if i % self.chunk == 0:
+                await asyncio.sleep(0)
+        self.sample_time = time.perf_counter() - t0
+        return records
+
+    def diff(self, records):
+        previous = self.records
+        changed = {name: record for name, record in records.items() if previous.get(name) != record}
+        removed = frozenset(name for name in previous if name not in records)
+        self.seq += 1
+        frame = Frame(self.seq, time.time(), changed, removed, full=self.seq == 1)
+        self.records = records
+        return frame
+
+    async def publish(self):
+        frame = self.diff(await self.sample())
+        if frame.changed or frame.removed or frame.full:
+            self.queue.put(frame)
+        return frame
+
+    async def run(self):
+        # Ritmo da interface em tempo real, mesmo com o relógio virtual da simulação
+        interval = 1.0 / self.rate
+        while True:
+            started = time.perf_counter()
+            await self.publish()
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {
+            "samples": self.seq,
+            "published": self.queue.published,
+            "coalesced": self.queue.coalesced,
+            "pending": len(self.queue),
+            "sample_ms": 1000 * self.sample_time,
+        }
+
+
+class SnapshotView:
+    """Estado {nome: dict} do lado da interface, atualizado frame a frame."""
+
+    def __init__(self):
+        self.agents = {}
+
+    def apply(self, frame):
+        if frame is None:
+            return self.agents
+        if frame.full:
+            self.agents = {}
+        for name in frame.removed:
+            self.agents.pop(name, None)
+        for name, record in frame.changed.items():
+            self.agents[name] = asdict(record)
+        return self.agents
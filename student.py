@@ -1,50 +1,79 @@
 from spade.agent import Agent
 from spade.message import Message
+from spade.template import Template
 from spade import behaviour
 from spade.presence import PresenceType, PresenceShow
-from colorama import Fore, Style
-import asyncio, random, time
-from metrics import MetricsLogger
-
-
-class StudentAgent(Agent):
-    def __init__(self, jid, password, learning_style="visual", disciplines=None):
+from colorama import Fore
+import asyncio, random
+from metrics import get_metrics_logger
+import clock
+from directory import directory
+from conversation import ProposalCollector
+import codec
+from knowledge import KnowledgeState
+from tracing import tracer
+from logs import get_logger
+from lifecycle import lifecycle, LifecycleMixin
+import itertools
+
+
+class StudentAgent(LifecycleMixin, Agent):
+    def __init__(self, jid, password, learning_style="visual", disciplines=None, cfp_fanout=3, proposal_deadline=2.0):
         random.seed(1)
         super().__init__(jid, password)
+        self.log = get_logger(self.name)
         self.learning_style = learning_style
+        self.cfp_fanout = cfp_fanout  # Nº máximo de tutores a contactar por pedido
+        self.proposal_deadline = proposal_deadline  # Prazo máximo para recolher propostas (s)
+        self.collector = None  # ProposalCollector da conversa em curso
+        self.thread = None  # thread do último pedido de ajuda
+        self.conversation_ids = itertools.count(1)
+        self.late_proposals = 0
         
         # Usar disciplinas padrão se não fornecidas
         if disciplines is None:
             disciplines = ["estatística bayesiana", "aprendizagem automática", "programação",
                           "estatística", "português", "álgebra"]
         
-        self.knowledge = {}
-        for discipline in disciplines:
-            self.knowledge.update({discipline: random.uniform(0, 0.4)})
-        print(self.knowledge)
+        self.knowledge = KnowledgeState(disciplines, [random.uniform(0, 0.4) for _ in disciplines])
+        self.log.debug("%s", self.knowledge)
         self.initial_knowledge = self.knowledge.copy()
         self.tutor_message = NotImplementedError
-        self.progress = sum(self.knowledge.values()) / len(self.knowledge)
+        self.progress = self.knowledge.progress
         self.initial_progress = self.progress
         self.topic = None 
-        self.logger = MetricsLogger()
+        self.logger = get_metrics_logger()  # sink partilhado por todos os estudantes
         self.can_start_studying = False  
         self.is_stopping = False  
-        print(Fore.CYAN + f"[{self.name}] estilo={self.learning_style} progresso médio={round(self.progress, 2)}" + Style.RESET_ALL)
+        self.log.info("estilo=%s progresso médio=%s", self.learning_style, round(self.progress, 2), color=Fore.CYAN, event="setup")
 
     async def setup(self):
-        print(Fore.CYAN + f"[Student-{self.name}] Iniciado")
+        self.log.info("Iniciado", color=Fore.CYAN, event="setup")
         self.study = self.StudyBehaviour()
-        self.add_behaviour(self.Subscription())
-        self.add_behaviour(self.study)
+        # Nenhuma mensagem tem este metadata: estes behaviours não lêem a caixa de
+        # correio, e sem template guardariam uma cópia de cada mensagem recebida
+        self.add_behaviour(self.Subscription(), Template(metadata={"student": "internal"}))
+        self.add_behaviour(self.study, Template(metadata={"student": "internal"}))
         self.add_behaviour(self.ReceiveBehaviour())
         self.proposals = []
     
+    def waiting_lesson(self):
+        """True se há uma lição de um tutor aceite (accept enviado) que ainda não chegou."""
+        trace = tracer.get(self.thread)
+        return trace is not None and trace.tutor != "peer" and \
+            "accept_sent" in trace.stages and "inform_received" not in trace.stages
+
+    async def stop(self):
+        await super().stop()
+        await self.teardown()
+
     async def teardown(self):
         """Chamado quando o agente está parando"""
-        final_progress = sum(self.knowledge.values()) / len(self.knowledge)
-        print(Fore.YELLOW + f"🔻 A parar {self.name}..." + Style.RESET_ALL)
-        print(Fore.CYAN + f"Progresso Final: {self.initial_progress} -> {final_progress}" + Style.RESET_ALL)
+        # Garantir que as métricas pendentes chegam ao ficheiro
+        await asyncio.get_running_loop().run_in_executor(None, self.logger.flush)
+        final_progress = self.knowledge.progress
+        self.log.info("🔻 A parar...", color=Fore.YELLOW, event="stop")
+        self.log.info("Progresso Final: %s -> %s", self.initial_progress, final_progress, color=Fore.CYAN, event="stop")
 
     class Subscription(behaviour.OneShotBehaviour):
         """ Manages presence subscriptions with other agents. """
@@ -62,17 +91,17 @@ class StudentAgent(Agent):
             )
 
             # ⚙️ Esperar servidor estabilizar
-            await asyncio.sleep(2)
+            await clock.sleep(2)
             contacts = self.agent.presence.get_contacts()
 
         def on_available(self, peer_jid, presence_info, last_presence):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} is {presence_info.show.value}")
+            self.agent.log.debug("Agent %s is %s", peer_jid.split("@")[0], presence_info.show.value, event="presence")
 
         def on_subscribed(self, peer_jid):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} accepted the subscription")
+            self.agent.log.debug("Agent %s accepted the subscription", peer_jid.split("@")[0], event="presence")
 
         def on_subscribe(self, peer_jid):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} asked for subscription. Approving...")
+            self.agent.log.debug("Agent %s asked for subscription. Approving...", peer_jid.split("@")[0], event="presence")
             self.agent.presence.approve_subscription(peer_jid)
             self.agent.presence.subscribe(peer_jid) 
 
@@ -82,40 +111,43 @@ class StudentAgent(Agent):
             self.peer_used = False
             self.chosen_tutor = None
             self.chosen_tutor_expertise = None
-            self.start_time = time.time()
-            print(f"[{self.agent.name}] {self.agent.presence.get_presence()}")
+            self.start_time = clock.time()
+            self.agent.log.debug("%s", self.agent.presence.get_presence(), event="presence")
             
             # 🔴 ESPERAR ATÉ TODOS OS AGENTES ESTAREM PRONTOS
-            while not self.agent.can_start_studying:
-                await asyncio.sleep(1)
+            if not await lifecycle.wait_started():
+                return
             
-            print(Fore.GREEN + f"[{self.agent.name}] ✅ Recebeu sinal de início - começando estudos" + Style.RESET_ALL)
-            await asyncio.sleep(2)
+            self.agent.log.info("✅ Recebeu sinal de início - começando estudos", color=Fore.GREEN, event="start")
+            await clock.sleep(2)
             
             while not self.agent.is_stopping:
+                # ⏸️ Em pausa não se fazem novos pedidos
+                if not await lifecycle.wait_running():
+                    return
                 # ✅ Recalcular progresso a cada iteração
-                self.agent.progress = sum(self.agent.knowledge.values()) / len(self.agent.knowledge)
+                self.agent.progress = self.agent.knowledge.progress
                 
                 # ✅ Verificar se já chegou a 100%
                 if self.agent.progress >= 1.0:
-                    print(Fore.LIGHTGREEN_EX + f"[{self.agent.name}] 🎉 Max Progress!" + Style.RESET_ALL)
+                    self.agent.log.info("🎉 Max Progress!", color=Fore.LIGHTGREEN_EX)
                     return
                 old = self.agent.topic
-                self.agent.topic = random.choice(list(self.agent.knowledge.keys()))
+                self.agent.topic = random.choice(self.agent.knowledge.topics)
                 self.agent.progress_topic = self.agent.knowledge[self.agent.topic]
-                print(Fore.YELLOW + f"[{self.agent.name}] Mudando tópico de {old} para {self.agent.topic}" + Style.RESET_ALL)
+                self.agent.log.debug("Mudando tópico de %s para %s", old, self.agent.topic, color=Fore.YELLOW, event="topic")
                 if (self.agent.progress_topic >= 1.0):
                     continue
-                print(Fore.BLUE + f"[{self.agent.name}] 🎯 A estudar {self.agent.topic} (progresso: {self.agent.progress:.2f})" + Style.RESET_ALL)
+                self.agent.log.info("🎯 A estudar %s (progresso: %.2f)", self.agent.topic, self.agent.progress, color=Fore.BLUE, event="study")
                 await self.ask_for_help()
                 await self.update_progress()
-                await asyncio.sleep(2)
+                await clock.sleep(2)
 
         async def update_progress(self):
             old = self.agent.progress
-            self.agent.progress = sum(self.agent.knowledge.values()) / len(self.agent.knowledge)
-            print(Fore.MAGENTA + f"[{self.agent.name}] 📊 Progresso geral atualizado: {old:.2f} -> {self.agent.progress:.2f}" + Style.RESET_ALL)
-            await asyncio.sleep(1)
+            self.agent.progress = self.agent.knowledge.progress
+            self.agent.log.debug("📊 Progresso geral atualizado: %.2f -> %.2f", old, self.agent.progress, color=Fore.MAGENTA, event="progress")
+            await clock.sleep(1)
 
         async def ask_for_help(self):
             if self.agent.is_stopping:
@@ -123,6 +155,9 @@ class StudentAgent(Agent):
             
             # 🔴 LIMPAR propostas antigas antes de novo pedido
             self.agent.proposals = []
+            self.peer_used = False
+            self.chosen_tutor = None
+            self.chosen_tutor_expertise = None
             
             tutors = []
             peers = []
@@ -135,22 +170,41 @@ class StudentAgent(Agent):
                 elif contact.startswith("peer"):
                     peers.append(contact)
 
+            # 📇 Com diretório: CFP só aos k melhores tutores com vagas
+            if len(directory):
+                tutors = directory.candidates(self.agent.topic, k=self.agent.cfp_fanout)
+
+            # 🧵 Nova conversa: as respostas são associadas pelo thread
+            thread = f"{self.agent.name}-{next(self.agent.conversation_ids)}"
+            collector = ProposalCollector(thread, tutors)
+            self.agent.collector = collector
+            self.agent.thread = thread
+            trace = tracer.start(thread, self.agent.name, self.agent.topic)
+
             for tutor in tutors:
-                msg = Message(to=tutor)
+                msg = Message(to=tutor, thread=thread)
                 msg.set_metadata("performative", "cfp")
-                msg.body = f"topic:{self.agent.topic};progress:{self.agent.progress};style:{self.agent.learning_style}"
-                print(Fore.BLUE + f"[{self.agent.name}] CFP → {tutor}: {self.agent.topic}" + Style.RESET_ALL)
+                msg.body = codec.encode(codec.HelpRequest(self.agent.topic, self.agent.progress, self.agent.learning_style, self.agent.knowledge[self.agent.topic]))
+                self.agent.log.debug("CFP → %s: %s", tutor, self.agent.topic, color=Fore.BLUE, event="cfp")
                 await self.send(msg)
 
-            await asyncio.sleep(2)
+            missing = await collector.wait(self.agent.proposal_deadline)
+            self.agent.collector = None
+            self.agent.proposals = collector.proposals
+            trace.mark("proposals_closed")
+            trace.proposals = len(collector.proposals)
+            if missing:
+                self.agent.log.info("⏱️ Prazo esgotado — %d tutor(es) sem resposta", missing, color=Fore.YELLOW, event="deadline")
 
             if not self.agent.proposals:
-                print(Fore.RED + f"[{self.agent.name}] ❌ Nenhum tutor respondeu — pedir peer" + Style.RESET_ALL)
+                self.agent.log.info("❌ Nenhum tutor respondeu — pedir peer", color=Fore.RED, event="no-tutor")
                 self.peer_used = True
                 self.chosen_tutor = "peer" 
 
+                trace.mark("accept_sent")
+                trace.tutor = "peer"
                 for peer in peers:
-                    peer = Message(to=peer)
+                    peer = Message(to=peer, thread=thread)
                     peer.set_metadata("performative", "peer-help")
                     await self.send(peer)
                 return
@@ -168,12 +222,12 @@ class StudentAgent(Agent):
                     
                 if p["slots"] > 0 and p["discipline"] == self.agent.topic:
                     self.chosen_tutor = p["tutor"]
-                    print(Fore.RED + f"[{self.agent.name}] Proposal chosen: {p}" + Style.RESET_ALL)
+                    self.agent.log.debug("Proposal chosen: %s", p, color=Fore.RED, event="choice")
                     self.agent.tutor_message = p
                     break
                 elif p["slots"] > 0 and p["expertise"] >= (self.chosen_tutor_expertise if self.chosen_tutor_expertise else 0):
                     self.chosen_tutor = p["tutor"]
-                    print(Fore.RED + f"[{self.agent.name}] Proposal chosen (different discipline): {p}" + Style.RESET_ALL)
+                    self.agent.log.debug("Proposal chosen (different discipline): %s", p, color=Fore.RED, event="choice")
                     self.agent.tutor_message = p
                     self.chosen_tutor = p["tutor"]
                     self.chosen_tutor_expertise = p["expertise"]
@@ -183,18 +237,24 @@ class StudentAgent(Agent):
             if not self.chosen_tutor:
                 if self.agent.is_stopping:
                     return
-                print(Fore.YELLOW + f"[{self.agent.name}] Nenhum tutor com vagas — tentar novamente em 3s" + Style.RESET_ALL)
-                await asyncio.sleep(3)
+                self.agent.log.info("Nenhum tutor com vagas — tentar novamente em 3s", color=Fore.YELLOW, event="no-slots")
+                tracer.abandon(thread)
+                await clock.sleep(3)
+                # Entretanto um tutor pode ter oferecido a vaga (fila de espera)
+                if self.agent.waiting_lesson():
+                    return
                 await self.ask_for_help()
                 return
 
             if self.agent.is_stopping:
                 return
                 
-            print(Fore.BLUE + f"[{self.agent.name}] ✉️ Aceitou proposta de {self.chosen_tutor}" + Style.RESET_ALL)
+            self.agent.log.info("✉️ Aceitou proposta de %s", self.chosen_tutor, color=Fore.BLUE, event="accept")
 
-            msg = Message(to=self.chosen_tutor)
+            msg = Message(to=self.chosen_tutor, thread=collector.thread)
             msg.set_metadata("performative", "accept-proposal")
+            trace.mark("accept_sent")
+            trace.tutor = self.chosen_tutor
             await self.send(msg)
 
             # Rejeitar os outros
@@ -203,11 +263,16 @@ class StudentAgent(Agent):
                 if self.agent.is_stopping:
                     return
                 if p["tutor"] != self.chosen_tutor and p["tutor"] not in rejected_tutors:
-                    rej = Message(to=p["tutor"])
+                    rej = Message(to=p["tutor"], thread=collector.thread)
                     rej.set_metadata("performative", "reject-proposal")
                     await self.send(rej)
                     rejected_tutors.add(p["tutor"])
-            
+            # Os tutores que recusaram guardam o pedido na fila de espera: retirá-lo
+            for tutor in collector.refused:
+                rej = Message(to=tutor, thread=collector.thread)
+                rej.set_metadata("performative", "reject-proposal")
+                await self.send(rej)
+
             # 🔴 LIMPAR PROPOSTAS após processar
             self.agent.proposals = []
 
@@ -221,28 +286,68 @@ class StudentAgent(Agent):
                 priority=2  # connection priority
             )
 
-            print(Fore.BLUE + f"[{self.agent.name}] ⏳ A aguardar explicação..." + Style.RESET_ALL)
+            self.agent.log.debug("⏳ A aguardar explicação...", color=Fore.BLUE, event="waiting")
 
         async def run(self):
-            if self.agent.is_stopping:
+            # O ciclo de estudo corre todo em on_start: quando acaba (100% ou paragem)
+            # o behaviour termina em vez de acordar a cada segundo
+            self.kill()
+
+    class ReceiveBehaviour(behaviour.CyclicBehaviour):
+        async def ask_peers(self, topic):
+            """Nova conversa só com os peers (quando o tutor escolhido falha)."""
+            peers = [str(c) for c in self.agent.presence.get_contacts() if str(c).startswith("peer")]
+            if not peers or self.agent.is_stopping:
                 return
-            # ✅ Parar se já atingiu 100%
-            if self.agent.progress >= 1.0:
+            thread = f"{self.agent.name}-{next(self.agent.conversation_ids)}"
+            self.agent.thread = thread
+            trace = tracer.start(thread, self.agent.name, topic)
+            trace.mark("proposals_closed")
+            trace.mark("accept_sent")
+            trace.tutor = "peer"
+            self.agent.study.peer_used = True
+            self.agent.study.chosen_tutor = "peer"
+            for peer in peers:
+                msg = Message(to=peer, thread=thread)
+                msg.set_metadata("performative", "peer-help")
+                await self.send(msg)
+
+        async def handle_offer(self, msg, proposal):
+            """Aceita a vaga oferecida se não há pedido nem lição em curso; senão rejeita-a (o tutor passa-a ao seguinte)."""
+            reply = Message(to=str(msg.sender), thread=msg.thread)
+            if self.agent.collector is not None or self.agent.waiting_lesson() or self.agent.is_stopping:
+                self.agent.late_proposals += 1
+                self.agent.log.info("⌛ Proposta tardia de %s rejeitada", msg.sender, color=Fore.RED, event="late")
+                reply.set_metadata("performative", "reject-proposal")
+                await self.send(reply)
                 return
-            await asyncio.sleep(1)
 
-    class ReceiveBehaviour(behaviour.CyclicBehaviour):
+            self.agent.log.info("✉️ Aceitou vaga oferecida por %s", msg.sender, color=Fore.BLUE, event="accept")
+            trace = tracer.start(msg.thread, self.agent.name, self.agent.topic)
+            trace.mark("proposals_closed")
+            trace.proposals = 1
+            trace.mark("accept_sent")
+            trace.tutor = str(msg.sender)
+            self.agent.thread = msg.thread
+            self.agent.study.chosen_tutor = str(msg.sender)
+            self.agent.tutor_message = {
+                "tutor": str(msg.sender),
+                "discipline": proposal.discipline,
+                "expertise": proposal.expertise,
+                "slots": proposal.slots
+            }
+            reply.set_metadata("performative", "accept-proposal")
+            await self.send(reply)
+
         async def run(self):
-            if self.agent.is_stopping:
-                return
-            
-            self.agent.progress = sum(self.agent.knowledge.values()) / len(self.agent.knowledge)
-            
-            # ✅ Parar se já atingiu 100%
-            if self.agent.progress >= 1.0:
+            self.agent.progress = self.agent.knowledge.progress
+
+            # ✅ Parar se já atingiu 100% (ou se o agente está a parar)
+            if self.agent.is_stopping or self.agent.progress >= 1.0:
+                self.kill()
                 return
             
-            msg = await self.receive(timeout=1)
+            msg = await lifecycle.receive(self)
             if not msg:
                 return
 
@@ -250,25 +355,45 @@ class StudentAgent(Agent):
 
             # --- proposta de tutor ---
             if perf == "propose":
-                parts = dict(p.split(":") for p in msg.body.split(";"))
-                discipline = parts.get("discipline", "")
-                expertise = float(parts.get("expertise", 0))
-                slots = int(parts.get("slots", 0))
+                try:
+                    proposal = codec.decode(msg.body, codec.Proposal)
+                except codec.CodecError as e:
+                    self.agent.log.warning("⚠️ Proposta inválida de %s: %s", msg.sender, e, color=Fore.RED)
+                    return
+                discipline = proposal.discipline
+                expertise = proposal.expertise
+                slots = proposal.slots
+
+                # 🧵 Proposta fora da conversa em curso: tardia, ou um tutor que
+                # libertou uma vaga e a oferece a quem estava na fila de espera
+                collector = self.agent.collector
+                if collector is None or not collector.matches(msg):
+                    await self.handle_offer(msg, proposal)
+                    return
 
-                # 🔴 EVITAR DUPLICADOS: Verificar se já existe proposta deste tutor
+                # 🔴 EVITAR DUPLICADOS: o collector só aceita uma resposta por tutor
                 tutor_jid = str(msg.sender)
-                if not any(p["tutor"] == tutor_jid for p in self.agent.proposals):
-                    self.agent.proposals.append({
-                        "tutor": tutor_jid,
-                        "discipline": discipline,
-                        "expertise": expertise,
-                        "slots": slots
-                    })
-                    print(Fore.YELLOW + f"[{self.agent.name}] 📩 Proposta de {msg.sender}: (discipline= {discipline}, exp={expertise}, slots={slots})" + Style.RESET_ALL)
+                if collector.add_proposal(msg.sender.bare, {
+                    "tutor": tutor_jid,
+                    "discipline": discipline,
+                    "expertise": expertise,
+                    "slots": slots
+                }):
+                    self.agent.log.debug("📩 Proposta de %s: (discipline= %s, exp=%s, slots=%s)", msg.sender, discipline, expertise, slots, color=Fore.YELLOW, event="proposal")
 
             # --- tutor rejeitou ---
             elif perf == "refuse":
-                print(Fore.RED + f"[{self.agent.name}] ❌ {msg.sender} ocupado — tentar outro" + Style.RESET_ALL)
+                collector = self.agent.collector
+                if collector is not None and collector.matches(msg):
+                    collector.add_refusal(msg.sender.bare)
+                self.agent.log.info("❌ %s ocupado — tentar outro", msg.sender, color=Fore.RED, event="busy")
+
+                # O tutor aceite recusou (a reserva expirou): a lição não vem, pedir a um peer
+                trace = tracer.get(msg.thread)
+                if trace is not None and "accept_sent" in trace.stages and \
+                        str(trace.tutor).split("/")[0] == str(msg.sender.bare):
+                    tracer.abandon(msg.thread)
+                    await self.ask_peers(trace.topic)
                 return
 
             # --- explicação recebida ---
@@ -277,10 +402,21 @@ class StudentAgent(Agent):
                 if self.agent.is_stopping or self.agent.progress >= 1.0:
                     return
                     
-                study = self.agent.study
-                chosen = "peer" if study.peer_used else study.chosen_tutor
-                end = time.time()
-                rt = round(end - study.start_time, 2)
+                # 🧵 Conversa a que pertence a lição (os peers podem responder mais do que uma vez)
+                trace = tracer.get(msg.thread or self.agent.thread)
+                if trace is not None and "inform_received" not in trace.stages:
+                    trace.mark("inform_received")
+                if trace is not None:
+                    chosen, topic = trace.tutor, trace.topic
+                    rt = round(trace.duration("response"), 2)
+                    proposals = trace.proposals
+                else:
+                    # Conversa já fechada (ex.: resposta tardia a um pedido substituído):
+                    # quem ensinou é o remetente, não a escolha do pedido atual
+                    sender = str(msg.sender.bare)
+                    chosen, topic = ("peer" if sender.startswith("peer") else sender), self.agent.topic
+                    rt = float("nan")
+                    proposals = 0
 
                 self.agent.presence.set_presence(
                     presence_type=PresenceType.AVAILABLE,  # set availability
@@ -289,16 +425,16 @@ class StudentAgent(Agent):
                     priority=2  # connection priority
                 ) 
 
-                print(Fore.GREEN + f"[{self.agent.name}] ✅ Explicação recebida por {chosen}" + Style.RESET_ALL)
-                old = self.agent.knowledge[self.agent.topic]
+                self.agent.log.info("✅ Explicação recebida por %s", chosen, color=Fore.GREEN, event="inform")
+                old = self.agent.knowledge[topic]
 
                 if chosen == "peer":
-                    self.agent.knowledge[self.agent.topic] = min(1.0, old + random.uniform(0.03, 0.10))
-                elif self.agent.tutor_message and self.agent.tutor_message["discipline"] == self.agent.topic:
-                    self.agent.knowledge[self.agent.topic] = min(1.0, old + (random.uniform(0.08, 0.25) * self.agent.tutor_message["expertise"]))
+                    self.agent.knowledge[topic] = min(1.0, old + random.uniform(0.03, 0.10))
+                elif self.agent.tutor_message and self.agent.tutor_message["discipline"] == topic:
+                    self.agent.knowledge[topic] = min(1.0, old + (random.uniform(0.08, 0.25) * self.agent.tutor_message["expertise"]))
                 else:
-                    self.agent.knowledge[self.agent.topic] = min(1.0, old + (random.uniform(0.05, 0.15) * self.agent.tutor_message["expertise"]))
-                print(Fore.GREEN + f"[{self.agent.name}] 🎓 progresso {old:.2f} → {self.agent.knowledge[self.agent.topic]:.2f}" + Style.RESET_ALL)
+                    self.agent.knowledge[topic] = min(1.0, old + (random.uniform(0.05, 0.15) * self.agent.tutor_message["expertise"]))
+                self.agent.log.info("🎓 progresso %.2f → %.2f", old, self.agent.knowledge[topic], color=Fore.GREEN, event="progress")
 
                 self.chosen_tutor = None
                 self.chosen_tutor_expertise = None
@@ -307,27 +443,29 @@ class StudentAgent(Agent):
                 self.agent.logger.log(
                     student=self.agent.name,
                     tutor=chosen,
-                    topic=self.agent.topic,
+                    topic=topic,
                     general_progress=self.agent.progress,
                     response_time=rt,
-                    proposals_received=len(self.agent.proposals),
+                    proposals_received=proposals,
                     chosen_tutor=chosen,
-                    rejected_count=(len(self.agent.proposals) - 1) if chosen != "peer" else 0,
+                    rejected_count=max(0, proposals - 1) if chosen != "peer" else 0,
                     peer_used=(chosen == "peer")
                 )
 
                 # ✅ Verificar se chegou a 100% ANTES de pedir recurso
-                self.agent.progress = sum(self.agent.knowledge.values()) / len(self.agent.knowledge)
+                self.agent.progress = self.agent.knowledge.progress
                 if self.agent.progress >= 1.0:
-                    print(Fore.LIGHTGREEN_EX + f"[{self.agent.name}] 🎉 Atingiu 100% de progresso!" + Style.RESET_ALL)
+                    self.agent.log.info("🎉 Atingiu 100% de progresso!", color=Fore.LIGHTGREEN_EX)
+                    if trace is not None:
+                        tracer.finish(trace.thread)
                     return  # Não pedir mais recursos
 
                 # --- 💡 Pedir recurso complementar ---
-                resource_msg = Message(to="resource@localhost")
+                resource_msg = Message(to="resource@localhost", thread=trace.thread if trace else None)
                 resource_msg.set_metadata("performative", "resource-request")
-                resource_msg.body = f"topic:{self.agent.topic};progress:{self.agent.progress};style:{self.agent.learning_style}"
+                resource_msg.body = codec.encode(codec.HelpRequest(topic, self.agent.progress, self.agent.learning_style, self.agent.knowledge[topic]))
                 await self.send(resource_msg)
-                print(Fore.YELLOW + f"[{self.agent.name}] 🔎 A pedir recurso complementar ao Resource Manager...")
+                self.agent.log.info("🔎 A pedir recurso complementar ao Resource Manager...", color=Fore.YELLOW, event="resource")
 
             # --- recurso recebido ---
             elif perf == "resource-recommendation":
@@ -335,17 +473,24 @@ class StudentAgent(Agent):
                 if self.agent.is_stopping or self.agent.progress >= 1.0:
                     return
                     
-                resource = msg.body.split("resource:")[1]
-                print(Fore.LIGHTYELLOW_EX + f"[{self.agent.name}] 📘 Recurso complementar recebido: {resource}" + Style.RESET_ALL)
+                try:
+                    resource = codec.decode(msg.body, codec.ResourceRecommendation).resource
+                except codec.CodecError as e:
+                    self.agent.log.warning("⚠️ Recomendação inválida: %s", e, color=Fore.RED)
+                    return
+                self.agent.log.info("📘 Recurso complementar recebido: %s", resource, color=Fore.LIGHTYELLOW_EX, event="resource")
+                trace = tracer.mark(msg.thread, "resource_received")
+                tracer.finish(msg.thread)
+                topic = trace.topic if trace else self.agent.topic
 
                 # 🔼 Aumentar ligeiramente o progresso
-                old = self.agent.knowledge[self.agent.topic]
-                self.agent.knowledge[self.agent.topic] = min(1.0, old + random.uniform(0.01, 0.05))
-                new = self.agent.knowledge[self.agent.topic]
-                await asyncio.sleep(2)
-                print(Fore.LIGHTGREEN_EX + f"[{self.agent.name}] 📈 progresso após recurso {old:.2f} → {new:.2f}" + Style.RESET_ALL)
+                old = self.agent.knowledge[topic]
+                self.agent.knowledge[topic] = min(1.0, old + random.uniform(0.01, 0.05))
+                new = self.agent.knowledge[topic]
+                await clock.sleep(2)
+                self.agent.log.info("📈 progresso após recurso %.2f → %.2f", old, new, color=Fore.LIGHTGREEN_EX, event="progress")
                 
                 # ✅ Verificar novamente após aplicar recurso
-                self.agent.progress = sum(self.agent.knowledge.values()) / len(self.agent.knowledge)
+                self.agent.progress = self.agent.knowledge.progress
                 if self.agent.progress >= 1.0:
-                    print(Fore.LIGHTGREEN_EX + f"[{self.agent.name}] 🎉 Atingiu 100% de progresso!" + Style.RESET_ALL)
\ No newline at end of file
+                    self.agent.log.info("🎉 Atingiu 100% de progresso!", color=Fore.LIGHTGREEN_EX)
\ No newline at end of file
@@ -0,0 +1,83 @@
+import pytest
+
+import clock
+from cache import RecommendationCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    previous = clock.get_clock()
+    fake = FakeClock()
+    clock.set_clock(fake)
+    yield fake
+    clock.set_clock(previous)
+
+
+def test_hit_and_miss(fake_clock):
+    cache = RecommendationCache()
+    assert cache.get("a") is None
+    cache.put("a", "video")
+    assert cache.get("a") == "video"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_lru_eviction(fake_clock):
+    cache = RecommendationCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" passa a ser a menos usada
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_put_refreshes_existing_key(fake_clock):
+    cache = RecommendationCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_ttl_expiration(fake_clock):
+    cache = RecommendationCache(ttl=10)
+    cache.put("a", 1)
+    fake_clock.now = 9.9
+    assert cache.get("a") == 1
+    fake_clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.expirations == 1
+
+
+def test_get_does_not_extend_ttl(fake_clock):
+    cache = RecommendationCache(ttl=10)
+    cache.put("a", 1)
+    fake_clock.now = 8
+    cache.get("a")
+    fake_clock.now = 12
+    assert cache.get("a") is None
+
+
+def test_new_version_invalidates(fake_clock):
+    cache = RecommendationCache(version=1)
+    cache.put("a", 1)
+    assert cache.get("a", version=1) == 1
+    assert cache.get("a", version=2) is None
+    assert cache.version == 2
+    assert cache.invalidations == 1
@@ -0,0 +1,92 @@
+import json
+import pickle
+
+import pytest
+
+import catalog
+from catalog import Resource, ResourceCatalog
+
+
+def resource(id, difficulty, topic="álgebra", style="visual"):
+    return Resource(id, f"r{id}", topic, style, difficulty, 10.0)
+
+
+@pytest.fixture
+def small():
+    return ResourceCatalog([resource(i, d) for i, d in enumerate([0.1, 0.3, 0.5, 0.7, 0.9], 1)]
+                           + [resource(10, 0.5, style="auditory")])
+
+
+def ids(resources):
+    return [r.id for r in resources]
+
+
+def test_top_k_closest_difficulty(small):
+    assert ids(small.top_k("álgebra", "visual", 0.52, k=3)) == [3, 4, 2]
+    assert ids(small.top_k("álgebra", "visual", 0.0, k=2)) == [1, 2]
+    assert ids(small.top_k("álgebra", "visual", 1.0, k=2)) == [5, 4]
+
+
+def test_top_k_ties_prefer_easier():
+    tied = ResourceCatalog([resource(1, 0.25), resource(2, 0.75)])
+    assert ids(tied.top_k("álgebra", "visual", 0.5, k=2)) == [1, 2]
+
+
+def test_top_k_difficulty_range(small):
+    assert ids(small.top_k("álgebra", "visual", 0.1, k=2, min_difficulty=0.4)) == [3, 4]
+    assert ids(small.top_k("álgebra", "visual", 0.9, k=5, max_difficulty=0.6)) == [3, 2, 1]
+
+
+def test_top_k_small_or_missing_groups(small):
+    assert ids(small.top_k("álgebra", "auditory", 0.1, k=3)) == [10]
+    assert small.top_k("álgebra", "kinesthetic", 0.5) == []
+    assert len(small) == 6
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "resources.json"
+    catalog.generate(str(path), 200, ["álgebra", "estatística"], ["visual", "auditory"], seed=3)
+    return str(path)
+
+
+def test_load_writes_and_reuses_index(source, monkeypatch):
+    first = ResourceCatalog.load(source)
+    assert len(first) == 200
+
+    def fail(path):
+        raise AssertionError("o índice devia ter sido reutilizado")
+    monkeypatch.setattr(catalog, "_read_resources", fail)
+    second = ResourceCatalog.load(source)
+    assert second.index == first.index
+    assert second.version == first.version
+
+
+@pytest.mark.parametrize("content", [
+    b"isto nao e um pickle",
+    pickle.dumps({"version": catalog.INDEX_VERSION, "fingerprint": "x", "index": {}})[:10],  # truncado
+    pickle.dumps(["não", "é", "um", "dict"]),
+    pickle.dumps({"index": {}}),
+])
+def test_corrupt_index_is_rebuilt(source, content):
+    expected = ResourceCatalog.load(source)
+    with open(source + ".idx", "wb") as file:
+        file.write(content)
+
+    rebuilt = ResourceCatalog.load(source)
+    assert rebuilt.index == expected.index
+    # O índice reconstruído substitui o corrompido
+    with open(source + ".idx", "rb") as file:
+        saved = pickle.load(file)
+    assert saved["fingerprint"] == rebuilt.fingerprint
+    assert saved["index"] == expected.index
+
+
+def test_changed_source_is_reindexed(source):
+    ResourceCatalog.load(source)
+    with open(source, "w", encoding="utf-8") as file:
+        json.dump([{"id": 1, "title": "novo", "topic": "álgebra", "style": "visual",
+                    "difficulty": 0.5, "duration": 5}], file)
+    reloaded = ResourceCatalog.load(source)
+    assert len(reloaded) == 1
+    assert ids(reloaded.top_k("álgebra", "visual", 0.5)) == [1]
@@ -0,0 +1,78 @@
+import pytest
+
+import codec
+from codec import CodecError, Explanation, HelpRequest, Proposal, Refusal, ResourceRecommendation
+
+
+@pytest.fixture(autouse=True)
+def json_wire_format():
+    yield
+    codec.set_wire_format("json")
+
+
+@pytest.mark.parametrize("body", [
+    HelpRequest("álgebra", 0.25, "visual", 0.4),
+    HelpRequest("álgebra", 0.25, "visual"),
+    Proposal("programação", 0.8, 2),
+    Refusal("no-slots"),
+    Explanation("Feito!"),
+    ResourceRecommendation("Video visual #1 on álgebra"),
+])
+def test_round_trip(body):
+    text = codec.encode(body)
+    assert text.startswith("{")
+    assert codec.decode(text, type(body)) == body
+
+
+def test_optional_fields_are_not_sent():
+    text = codec.encode(HelpRequest("álgebra", 0.25, "visual"))
+    assert "knowledge" not in text
+    assert codec.decode('{"v":1,"topic":"t","progress":0.1,"style":"s","knowledge":null}', HelpRequest).knowledge is None
+
+
+def test_legacy_round_trip():
+    codec.set_wire_format("legacy")
+    body = Proposal("programação", 0.8, 2)
+    text = codec.encode(body)
+    assert text == "discipline:programação;expertise:0.8;slots:2;available_in:1"
+    assert codec.decode(text, Proposal) == body
+
+
+def test_legacy_parsing():
+    assert codec.decode("topic:álgebra;progress:0.3;style:visual", HelpRequest) == HelpRequest("álgebra", 0.3, "visual")
+    # Nome antigo do campo e partes sem ':' ignoradas
+    assert codec.decode("explicacao:Feito!;lixo", Explanation) == Explanation("Feito!")
+
+
+def test_unknown_wire_format():
+    with pytest.raises(ValueError):
+        codec.set_wire_format("xml")
+
+
+@pytest.mark.parametrize("text", [
+    None,
+    b'{"v":1,"reason":"x"}',
+    "{not json",
+    '{"v":2,"reason":"x"}',
+    '{"reason":"x"}',
+])
+def test_bad_bodies(text):
+    with pytest.raises(CodecError):
+        codec.decode(text, Refusal)
+
+
+@pytest.mark.parametrize("text", [
+    '{"v":1,"discipline":"x","expertise":"0.8","slots":2}',  # número como texto em JSON
+    '{"v":1,"discipline":"x","expertise":0.8,"slots":true}',  # booleano
+    '{"v":1,"discipline":"x","expertise":0.8,"slots":1.5}',  # inteiro com parte decimal
+    '{"v":1,"discipline":1,"expertise":0.8,"slots":2}',  # texto esperado
+    '{"v":1,"discipline":"x","expertise":0.8}',  # campo obrigatório em falta
+    "discipline:x;expertise:alto;slots:2",  # formato antigo com valor inválido
+])
+def test_bad_fields(text):
+    with pytest.raises(CodecError):
+        codec.decode(text, Proposal)
+
+
+def test_codec_error_is_value_error():
+    assert issubclass(CodecError, ValueError)
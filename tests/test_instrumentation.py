@@ -0,0 +1,32 @@
+import asyncio
+
+from spade.message import Message
+
+from instrumentation import AgentStats
+from lifecycle import lifecycle
+from transport import LocalBus
+from tutor import TutorAgent
+
+
+def test_mailbox_depth_returns_to_zero_once_handled():
+    async def scenario():
+        lifecycle.reset()
+        lifecycle.start()
+        bus = LocalBus()
+        tutor = TutorAgent("tutor1@localhost", "1234", discipline="álgebra")
+        await bus.start(tutor)
+        stats = AgentStats(tutor)
+        try:
+            for _ in range(5):
+                msg = Message(to="tutor1@localhost", sender="student1@localhost")
+                msg.set_metadata("performative", "reject-proposal")
+                await bus.send(msg, None)
+            # Só o HelpResponder fica com as mensagens (o Subscription não as lê)
+            assert stats.mailbox_depth() == 5
+            for _ in range(50):
+                await asyncio.sleep(0)
+            assert stats.mailbox_depth() == 0
+        finally:
+            await bus.stop(tutor)
+            lifecycle.reset()
+    asyncio.run(scenario())
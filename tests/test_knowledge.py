@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from knowledge import KnowledgeState
+
+TOPICS = ["álgebra", "estatística", "programação"]
+
+
+def test_progress_is_mean_of_topics():
+    state = KnowledgeState(TOPICS, [0.1, 0.2, 0.6])
+    assert state.progress == pytest.approx(0.3)
+    assert state.total == pytest.approx(0.9)
+
+
+def test_all_topics_complete_is_exactly_one():
+    state = KnowledgeState(["t%d" % i for i in range(10)], [0.0] * 10)
+    for topic in state:
+        for _ in range(10):
+            state[topic] = state[topic] + 0.1
+    # 0.1 somado dez vezes em vírgula flutuante não dá 1.0: a soma fixa é a dos valores guardados
+    assert state.total == pytest.approx(sum(state.values()), abs=1e-12)
+    for topic in state:
+        state[topic] = 1.0
+    assert state.progress == 1.0
+    assert state.total == 10.0
+
+
+def test_incremental_sum_has_no_drift():
+    rng = random.Random(7)
+    state = KnowledgeState(TOPICS)
+    for _ in range(100000):
+        state[rng.choice(TOPICS)] = rng.random()
+    expected = sum(round(v * 2 ** 52) for v in state.values().tolist()) / 2 ** 52
+    assert state.total == expected
+    # Voltar aos valores iniciais repõe exatamente a soma inicial
+    for topic in TOPICS:
+        state[topic] = 0.0
+    assert state.total == 0.0
+    assert state.progress == 0.0
+
+
+def test_dict_interface():
+    state = KnowledgeState(TOPICS, [0.1, 0.2, 0.3])
+    assert len(state) == 3
+    assert "álgebra" in state and "português" not in state
+    assert list(state.keys()) == TOPICS
+    assert state.as_dict() == {"álgebra": 0.1, "estatística": 0.2, "programação": 0.3}
+    with pytest.raises(KeyError):
+        state["português"]
+
+
+def test_view_is_read_only():
+    state = KnowledgeState(TOPICS, [0.1, 0.2, 0.3])
+    with pytest.raises(ValueError):
+        state.view()[0] = 1.0
+
+
+def test_copy_is_independent():
+    state = KnowledgeState(TOPICS, [0.1, 0.2, 0.3])
+    copy = state.copy()
+    state["álgebra"] = 0.9
+    assert copy["álgebra"] == 0.1
+    assert copy.progress == pytest.approx(0.2)
+
+
+def test_topic_index_is_shared():
+    assert KnowledgeState(TOPICS).index is KnowledgeState(list(TOPICS)).index
+
+
+def test_needs_topics():
+    with pytest.raises(ValueError):
+        KnowledgeState([])
@@ -0,0 +1,17 @@
+import logging
+
+from logs import RateLimitFilter
+
+
+def _record(agent, event="progress"):
+    record = logging.LogRecord("isia.student", logging.INFO, __file__, 0, "msg", None, None)
+    record.agent, record.kind, record.event = agent, "student", event
+    return record
+
+
+def test_each_agent_has_its_own_window():
+    rate = RateLimitFilter(burst=2, period=60)
+    assert [rate.filter(_record("student1")) for _ in range(3)] == [True, True, False]
+    # student1 esgotou a sua janela, não a dos outros estudantes
+    assert rate.filter(_record("student2"))
+    assert rate.suppressed == {("student", "progress"): 1}
@@ -0,0 +1,8 @@
+import pytest
+
+from resource_manager import ResourceManagerAgent
+
+
+def test_workers_must_be_positive():
+    with pytest.raises(ValueError):
+        ResourceManagerAgent("resource@localhost", "1234", workers=0)
@@ -0,0 +1,48 @@
+import asyncio
+
+from tutor import TutorAgent
+
+
+async def _run(scenario):
+    tutor = TutorAgent("tutor1@localhost", "1234", discipline="álgebra", capacity=1, hold_time=100)
+    try:
+        scenario(tutor)
+    finally:
+        await tutor.teardown()
+
+
+def test_waiting_student_wins_freed_slot_over_newer_cfp():
+    def scenario(tutor):
+        assert tutor.admit("a", 0.5, now=0)
+        # Sem vaga: b fica na fila com a sua prioridade
+        assert not tutor.admit("b", 0.9, now=0.5)
+        assert tutor.queue.stats(now=0.5)["depth"] == 1
+        tutor.release("a")
+        # A vaga livre é de b: um CFP mais recente e menos prioritário é recusado
+        assert not tutor.admit("c", 0.6, now=1)
+        assert tutor.next_offer(now=1) == "b"
+        assert "b" in tutor.holds and tutor.available_slots == 0
+        assert tutor.next_offer(now=1) is None
+    asyncio.run(_run(scenario))
+
+
+def test_aged_student_wins_freed_slot():
+    def scenario(tutor):
+        tutor.available_slots = 0
+        assert not tutor.admit("old", 0.5, now=0)
+        tutor.available_slots = 1
+        # 0.5 vs 0.55 - 0.05 * 2: a antiguidade compensa a prioridade mais baixa
+        assert not tutor.admit("new", 0.55, now=2)
+        assert tutor.next_offer(now=2) == "old"
+    asyncio.run(_run(scenario))
+
+
+def test_stale_head_does_not_block_new_cfp():
+    def scenario(tutor):
+        tutor.available_slots = 0
+        assert not tutor.admit("gone", 0.9, now=0)
+        tutor.available_slots = 1
+        # O pedido de "gone" expirou (ttl): o CFP novo fica com a vaga
+        assert tutor.admit("new", 0.1, now=tutor.queue.ttl + 1)
+        assert "gone" not in tutor.queue
+    asyncio.run(_run(scenario))
@@ -0,0 +1,82 @@
+from waitlist import TutorWaitlist
+
+
+def test_peek_returns_highest_priority():
+    queue = TutorWaitlist(ttl=100)
+    queue.push("student1", 0.5, now=0)
+    queue.push("student2", 0.9, now=0)
+    assert queue.peek(now=0) == "student2"
+    assert len(queue) == 2
+
+
+def test_aging_lets_old_requests_overtake():
+    queue = TutorWaitlist(aging_rate=0.05, ttl=100)
+    queue.push("old", 1.0, now=0)
+    queue.push("new", 1.2, now=10)
+    # 1.0 + 0.05 * 10 = 1.5 > 1.2
+    assert queue.peek(now=10) == "old"
+    assert queue.effective_priority(queue._index["old"], now=10) == 1.5
+
+
+def test_push_updates_request_and_keeps_seniority():
+    queue = TutorWaitlist(ttl=100)
+    queue.push("student1", 0.5, now=0)
+    entry = queue.push("student1", 0.7, now=5)
+    assert len(queue) == 1
+    assert entry.enqueued_at == 0
+    assert entry.priority == 0.7
+    assert queue.wait_times(now=8) == {"student1": 8}
+
+
+def test_entries_expire_after_ttl():
+    queue = TutorWaitlist(ttl=3.0)
+    queue.push("student1", 0.9, now=0)
+    queue.push("student2", 0.1, now=2)
+    # student1 não renovou o pedido: sai da fila ao ser encontrado no topo
+    assert queue.peek(now=4) == "student2"
+    assert "student1" not in queue
+    assert queue.peek(now=10) is None
+    assert len(queue) == 0
+
+
+def test_renewed_request_does_not_expire():
+    queue = TutorWaitlist(ttl=3.0)
+    queue.push("student1", 0.9, now=0)
+    queue.push("student1", 0.9, now=2.5)
+    assert queue.peek(now=5) == "student1"
+
+
+def test_remove_is_lazy():
+    queue = TutorWaitlist(ttl=100)
+    queue.push("student1", 0.9, now=0)
+    queue.push("student2", 0.5, now=0)
+    queue.remove("student1")
+    assert "student1" not in queue
+    # A entrada fica no heap, marcada como inválida, até chegar ao topo
+    assert len(queue._heap) == 2
+    assert queue.peek(now=0) == "student2"
+    assert len(queue._heap) == 1
+    queue.remove("unknown")  # remover quem não está na fila não falha
+
+
+def test_pop_removes_student():
+    queue = TutorWaitlist(ttl=100)
+    queue.push("student1", 0.9, now=0)
+    assert queue.pop(now=0) == "student1"
+    assert queue.pop(now=0) is None
+    assert len(queue) == 0
+
+
+def test_heap_is_compacted():
+    queue = TutorWaitlist(ttl=100)
+    for i in range(1000):
+        queue.push("student1", i / 1000, now=i / 1000)
+    assert len(queue) == 1
+    assert len(queue._heap) <= 2 * len(queue) + 17
+
+
+def test_stats():
+    queue = TutorWaitlist(ttl=100)
+    queue.push("student1", 0.5, now=0)
+    queue.push("student2", 0.5, now=4)
+    assert queue.stats(now=6) == {"depth": 2, "max_wait": 6, "mean_wait": 4.0}
@@ -0,0 +1,142 @@
+"""
+tracing.py - Rasto de cada pedido de ajuda (conversa) ao longo do protocolo.
+
+Cada pedido tem um thread próprio ("student1-3"). O estudante marca o
+instante (relógio da simulação) de cada etapa:
+
+    cfp_sent → proposals_closed → accept_sent → inform_received → resource_received
+
+e quando a conversa acaba as durações entre etapas alimentam histogramas por
+tutor e por tópico, resumidos em p50/p95/p99.
+"""
+from collections import defaultdict
+from colorama import Fore, Style
+import clock
+
+STAGES = ["cfp_sent", "proposals_closed", "accept_sent", "inform_received", "resource_received"]
+
+# Segmentos medidos: nome -> (etapa inicial, etapa final)
+SEGMENTS = {
+    "collect": ("cfp_sent", "proposals_closed"),
+    "decide": ("proposals_closed", "accept_sent"),
+    "lesson": ("accept_sent", "inform_received"),
+    "resource": ("inform_received", "resource_received"),
+    "response": ("cfp_sent", "inform_received"),
+}
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": values[-1],
+    }
+
+
+class ConversationTrace:
+    __slots__ = ("thread", "student", "topic", "tutor", "proposals", "stages")
+
+    def __init__(self, thread, student, topic):
+        self.thread = thread
+        self.student = student
+        self.topic = topic
+        self.tutor = None
+        self.proposals = 0
+        self.stages = {}
+
+    def mark(self, stage, when=None):
+        self.stages[stage] = clock.time() if when is None else when
+
+    def duration(self, segment):
+        start, end = SEGMENTS[segment]
+        if start in self.stages and end in self.stages:
+            return self.stages[end] - self.stages[start]
+        return None
+
+
+class Tracer:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.open = {}  # thread -> ConversationTrace
+        self.current = {}  # estudante -> thread da conversa mais recente
+        self.completed = 0
+        self.abandoned = 0
+        # (dimensão, chave, segmento) -> [durações]
+        self._samples = defaultdict(list)
+
+    def start(self, thread, student, topic):
+        # Um novo pedido substitui a conversa anterior do mesmo estudante: fechá-la
+        # (concluída se a lição chegou, abandonada se não) em vez de a deixar em aberto
+        previous = self.open.get(self.current.get(student))
+        if previous is not None and previous.thread != thread:
+            if "inform_received" in previous.stages:
+                self.finish(previous.thread)
+            else:
+                self.abandon(previous.thread)
+        self.current[student] = thread
+        trace = self.open[thread] = ConversationTrace(thread, student, topic)
+        trace.mark("cfp_sent")
+        return trace
+
+    def get(self, thread):
+        return self.open.get(thread)
+
+    def mark(self, thread, stage, tutor=None):
+        trace = self.open.get(thread)
+        if trace is None:
+            return None
+        trace.mark(stage)
+        if tutor is not None:
+            trace.tutor = tutor
+        return trace
+
+    def finish(self, thread):
+        trace = self.open.pop(thread, None)
+        if trace is None:
+            return None
+        self.completed += 1
+        for segment in SEGMENTS:
+            value = trace.duration(segment)
+            if value is None:
+                continue
+            self._samples[("all", "all", segment)].append(value)
+            self._samples[("topic", trace.topic, segment)].append(value)
+            if trace.tutor is not None:
+                self._samples[("tutor", trace.tutor, segment)].append(value)
+        return trace
+
+    def abandon(self, thread):
+        """Conversa sem lição (ex.: sem tutores com vagas, novo pedido)."""
+        if self.open.pop(thread, None) is not None:
+            self.abandoned += 1
+
+    def summary(self, by="all"):
+        """{chave: {segmento: percentis}} por "tutor", "topic" ou "all"."""
+        result = defaultdict(dict)
+        for (dimension, key, segment), values in self._samples.items():
+            if dimension == by:
+                result[key][segment] = percentiles(values)
+        return dict(result)
+
+    def print_summary(self, by="topic"):
+        print(Fore.CYAN + f"[Tracing] {self.completed} conversas concluídas, {self.abandoned} abandonadas, "
+              f"{len(self.open)} em aberto" + Style.RESET_ALL)
+        for key, segments in sorted(self.summary(by).items()):
+            parts = []
+            for segment in SEGMENTS:
+                stats = segments.get(segment)
+                if stats and stats["count"]:
+                    parts.append(f"{segment} p50={stats['p50']:.2f} p95={stats['p95']:.2f} p99={stats['p99']:.2f}")
+            print(f"    {key}: " + " | ".join(parts))
+
+
+tracer = Tracer()
@@ -0,0 +1,220 @@
+"""
+transport.py - Transporte de mensagens em memória para os agentes SPADE.
+
+O LocalBus substitui a ligação XMPP: os agentes são arrancados sem cliente,
+as mensagens são entregues diretamente nas filas dos behaviours e a presença
+(subscrições, contactos) é simulada pelo LocalPresence. Os behaviours
+existentes correm sem alterações, porque usam a mesma API
+(`self.send`, `self.receive`, `self.agent.presence`).
+"""
+from slixmpp import JID
+from spade.behaviour import FSMBehaviour
+from spade.presence import Contact, PresenceInfo, PresenceShow, PresenceType
+from colorama import Fore, Style
+
+
+class LocalPresence:
+    """Versão em memória do PresenceManager do SPADE (mesma interface pública)."""
+
+    def __init__(self, agent, bus, approve_all=False):
+        self.agent = agent
+        self.bus = bus
+        self.contacts = {}
+        self.current_presence = None
+        self.approve_all = approve_all
+
+        self.on_subscribe = self._noop
+        self.on_subscribed = self._noop
+        self.on_unsubscribe = self._noop
+        self.on_unsubscribed = self._noop
+        self.on_presence_received = self._noop
+        self.on_available = self._noop
+        self.on_unavailable = self._noop
+
+    @staticmethod
+    def _noop(*args, **kwargs):
+        pass
+
+    @property
+    def jid(self):
+        return str(self.agent.jid.bare)
+
+    # ---------- estado próprio ----------
+    def is_available(self):
+        return self.current_presence is not None and self.current_presence.is_available()
+
+    def get_presence(self):
+        return self.current_presence
+
+    def get_show(self):
+        return self.current_presence.show if self.current_presence else PresenceShow.NONE
+
+    def get_status(self):
+        return self.current_presence.status if self.current_presence else None
+
+    def get_priority(self):
+        return self.current_presence.priority if self.current_presence else 0
+
+    def set_presence(self, presence_type=PresenceType.AVAILABLE, show=PresenceShow.CHAT, status="", priority=0):
+        self.current_presence = PresenceInfo(presence_type, show, status, priority)
+        # Propagar aos agentes que nos subscreveram
+        for jid, contact in self.contacts.items():
+            if contact.subscription in ("from", "both"):
+                other = self.bus.presence_of(jid)
+                if other is not None:
+                    other._handle_presence(self.jid, self.current_presence)
+
+    def set_available(self):
+        self.set_presence(PresenceType.AVAILABLE)
+
+    def set_unavailable(self):
+        self.set_presence(PresenceType.UNAVAILABLE, PresenceShow.NONE, None, 0)
+
+    # ---------- contactos ----------
+    def get_contact(self, jid):
+        return self.contacts[str(JID(str(jid)).bare)]
+
+    def get_contacts(self):
+        return {jid: c for jid, c in self.contacts.items() if c.is_subscribed()}
+
+    def _contact(self, jid):
+        if jid not in self.contacts:
+            self.contacts[jid] = Contact(jid=JID(jid), name=jid, subscription="none", ask="", groups=[])
+        return self.contacts[jid]
+
+    # ---------- subscrições ----------
+    def subscribe(self, jid):
+        jid = str(JID(str(jid)).bare)
+        contact = self._contact(jid)
+        # Já subscrito (ou pedido pendente): evita o ciclo subscribe ↔ on_subscribe
+        if contact.subscription in ("to", "both") or contact.ask == "subscribe":
+            return
+        contact.update_subscription(contact.subscription, "subscribe")
+        other = self.bus.presence_of(jid)
+        if other is not None:
+            other._handle_subscribe(self.jid)
+
+    def approve_subscription(self, jid):
+        jid = str(JID(str(jid)).bare)
+        contact = self._contact(jid)
+        contact.update_subscription("both" if contact.subscription in ("to", "both") else "from", contact.ask)
+        other = self.bus.presence_of(jid)
+        if other is not None:
+            other._handle_subscribed(self.jid)
+            if self.is_available():
+                other._handle_presence(self.jid, self.current_presence)
+
+    def subscribed(self, jid):
+        contact = self._contact(str(jid))
+        contact.update_subscription("both" if contact.subscription in ("from", "both") else "to", "")
+
+    def unsubscribe(self, jid):
+        jid = str(JID(str(jid)).bare)
+        if jid in self.contacts:
+            contact = self.contacts[jid]
+            contact.update_subscription("from" if contact.subscription == "both" else "none", "")
+        other = self.bus.presence_of(jid)
+        if other is not None:
+            other.on_unsubscribe(self.jid)
+
+    # ---------- eventos vindos do bus ----------
+    def _handle_subscribe(self, peer_jid):
+        self._contact(peer_jid)
+        if self.approve_all:
+            self.approve_subscription(peer_jid)
+        self.on_subscribe(peer_jid)
+
+    def _handle_subscribed(self, peer_jid):
+        self.subscribed(peer_jid)
+        self.on_subscribed(peer_jid)
+
+    def _handle_presence(self, peer_jid, presence_info):
+        contact = self._contact(peer_jid)
+        was_available = contact.is_available()
+        contact.update_presence("local", presence_info)
+        if presence_info.is_available():
+            if not was_available:
+                self.on_available(peer_jid, presence_info, contact.last_presence)
+        elif was_available:
+            self.on_unavailable(peer_jid, presence_info, contact.last_presence)
+
+
+class LocalBus:
+    """
+    Bus de mensagens em processo. Expõe `send(msg, behaviour)` tal como o
+    Container do SPADE, por isso basta apontar `agent.container` para o bus.
+    """
+
+    def __init__(self):
+        self.agents = {}
+        self.delivered = 0
+        self.dropped = 0
+
+    def register(self, agent):
+        self.agents[str(agent.jid.bare)] = agent
+        agent.set_container(self)
+
+    def unregister(self, agent):
+        self.agents.pop(str(agent.jid.bare), None)
+
+    def presence_of(self, jid):
+        agent = self.agents.get(jid)
+        return agent.presence if agent is not None else None
+
+    async def start(self, agent, auto_register=True):
+        """Equivalente a `agent.start()` sem ligação XMPP."""
+        self.register(agent)
+        agent.presence = LocalPresence(agent, self)
+        await agent.setup()
+        agent._alive.set()
+        for behaviour in agent.behaviours:
+            if not behaviour.is_running:
+                behaviour.set_agent(agent)
+                if issubclass(type(behaviour), FSMBehaviour):
+                    for _, state in behaviour.get_states().items():
+                        state.set_agent(agent)
+                behaviour.start()
+
+    async def stop(self, agent):
+        """Equivalente a `agent.stop()`: mata os behaviours e sai do bus."""
+        if agent.presence:
+            agent.presence.set_unavailable()
+        for behaviour in list(agent.behaviours):
+            behaviour.kill()
+        agent._alive.clear()
+        self.unregister(agent)
+        teardown = getattr(agent, "teardown", None)
+        if teardown is not None:
+            await teardown()
+
+    def provision(self, pairs):
+        """
+        Liga pares de agentes (subscrição "both" nos dois sentidos) numa só
+        passagem, sem trocar subscribe/subscribed. Devolve o nº de contactos criados.
+        """
+        created = 0
+        for a, b in pairs:
+            pa, pb = self.presence_of(a), self.presence_of(b)
+            if pa is None or pb is None:
+                continue
+            for own, other in ((pa, pb), (pb, pa)):
+                contact = own._contact(other.jid)
+                if contact.subscription != "both":
+                    contact.update_subscription("both", "")
+                    created += 1
+                if other.current_presence is not None:
+                    contact.update_presence("local", other.current_presence)
+        return created
+
+    async def send(self, msg, behaviour):
+        to = str(msg.to.bare)
+        agent = self.agents.get(to)
+        if agent is None:
+            self.dropped += 1
+            print(Fore.RED + f"[LocalBus] ⚠️ Destinatário desconhecido: {to}" + Style.RESET_ALL)
+            return
+        # Entrega direta nas filas dos behaviours (sem tasks intermédias)
+        for b in agent.behaviours:
+            if b.match(msg):
+                b.queue.put_nowait(msg)
+        self.delivered += 1
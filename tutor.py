@@ -1,41 +1,140 @@
 from spade.agent import Agent
 from spade.message import Message
+from spade.template import Template
 from spade.behaviour import *
 from spade.presence import *
 from spade import behaviour
 import random
 import asyncio
-from colorama import Fore, Style
+from colorama import Fore
+import clock
+from directory import directory
+from waitlist import TutorWaitlist
+import codec
+from logs import get_logger
+from lifecycle import lifecycle, LifecycleMixin
 
 
-class TutorAgent(Agent):
-    def __init__(self, jid, password, discipline, expertise=0.5, capacity=1):
+class TutorAgent(LifecycleMixin, Agent):
+    def __init__(self, jid, password, discipline, expertise=0.5, capacity=1, teaching_time=2, hold_time=3.0):
         super().__init__(jid, password)
+        self.log = get_logger(self.name)
         self.discipline = discipline
         self.capacity = capacity
-        self.available_slots = capacity
+        self._available_slots = capacity
         self.expertise = expertise    # <-- NEW
-        self.queue = []  # (student, priority)
+        self.teaching_time = teaching_time
+        self.sessions = set()  # tasks das sessões de ensino em curso
+        # Vagas reservadas ao propor: estudante -> task que liberta a vaga ao fim de `hold_time`
+        # (prazo de recolha de propostas do estudante + margem para a decisão)
+        self.hold_time = hold_time
+        self.holds = {}
+        self.queue = TutorWaitlist()  # estudantes à espera, por prioridade
+        self.threads = {}  # estudante -> thread do último CFP (para lhe oferecer uma vaga)
+        self.responder = None
         self.can_start_helping = False  # Flag para controlar início
         self.is_stopping = False  # Flag para parar behaviours
 
+    @property
+    def available_slots(self):
+        return self._available_slots
+
+    @available_slots.setter
+    def available_slots(self, value):
+        # Manter o diretório sincronizado com as vagas livres
+        self._available_slots = value
+        directory.update_slots(self.jid.bare, value)
+
     async def setup(self):
-        print(Fore.CYAN + f"[Tutor-{self.name}] Started | Capacity: {self.capacity} | Available: {self.available_slots} | Expertise: {self.expertise}" + Style.RESET_ALL)
-        self.add_behaviour(self.HelpResponder())
-        self.add_behaviour(self.Subscription())
+        directory.register(self.jid.bare, self.discipline, self.expertise, self.available_slots)
+        self.log.info("Started | Capacity: %s | Available: %s | Expertise: %s", self.capacity, self.available_slots, self.expertise, color=Fore.CYAN, event="setup")
+        self.responder = self.HelpResponder()
+        self.add_behaviour(self.responder)
+        # Nenhuma mensagem tem este metadata: o Subscription não lê a caixa de correio
+        self.add_behaviour(self.Subscription(), Template(metadata={"tutor": "internal"}))
+
+    def admit(self, student, priority, now):
+        """
+        Põe o pedido de `student` na fila e devolve True se ele fica com uma vaga
+        (reservada). Sem vaga livre, ou com alguém mais prioritário à espera, o
+        pedido fica na fila com a sua prioridade (e antiguidade) até ao próximo CFP
+        ou até expirar (ttl).
+        """
+        self.queue.push(student, priority, now)
+        if self.available_slots > 0 and self.queue.peek(now) == student:
+            self.queue.pop(now)
+            self.hold(student)
+            return True
+        return False
+
+    def next_offer(self, now):
+        """Com uma vaga livre, reserva-a para o estudante à cabeça da fila e devolve-o (ou None)."""
+        if self.available_slots <= 0:
+            return None
+        student = self.queue.pop(now)
+        if student is not None:
+            self.hold(student)
+        return student
+
+    def hold(self, student):
+        """Reserva uma vaga para `student` enquanto ele decide."""
+        self.release(student)
+        self.available_slots -= 1
+        self.holds[student] = asyncio.create_task(self._expire_hold(student))
+
+    def release(self, student):
+        """Liberta a vaga reservada (rejeição ou prazo); devolve False se não havia reserva."""
+        task = self.holds.pop(student, None)
+        if task is None:
+            return False
+        task.cancel()
+        self.available_slots += 1
+        return True
+
+    def claim(self, student):
+        """Converte a reserva em sessão (a vaga continua ocupada)."""
+        task = self.holds.pop(student, None)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def _expire_hold(self, student):
+        await clock.sleep(self.hold_time)
+        if self.holds.get(student) is asyncio.current_task():
+            del self.holds[student]
+            self.available_slots += 1
+            self.queue.remove(student)
+            # O estudante não respondeu: a vaga passa ao seguinte na fila
+            if self.responder is not None and not self.is_stopping:
+                await self.responder.offer()
+
+    async def stop(self):
+        await super().stop()
+        await self.teardown()
+
+    async def teardown(self):
+        """Sai do diretório e cancela sessões e reservas (também chamado pelo LocalBus.stop)."""
+        directory.unregister(self.jid.bare)
+        for session in list(self.sessions):
+            session.cancel()
+        for task in self.holds.values():
+            task.cancel()
+        self.holds.clear()
+        self.threads.clear()
 
 
     class Subscription(OneShotBehaviour):
         def on_available(self, peer_jid, presence_info, last_presence):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} is {presence_info.show.value}")
+            self.agent.log.debug("Agent %s is %s", peer_jid.split("@")[0], presence_info.show.value, event="presence")
 
         def on_subscribed(self, peer_jid):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} has accepted the subscription")
+            self.agent.log.debug("Agent %s has accepted the subscription", peer_jid.split("@")[0], event="presence")
             contacts = self.agent.presence.get_contacts()
-            print(f"[{self.agent.name}] Contacts List: {contacts}")
+            self.agent.log.debug("Contacts List: %s", contacts, event="presence")
 
         def on_subscribe(self, peer_jid):
-            print(f"[{self.agent.name}] Agent {peer_jid.split('@')[0]} asked for subscription. Let's approve it")
+            self.agent.log.debug("Agent %s asked for subscription. Let's approve it", peer_jid.split("@")[0], event="presence")
             self.presence.approve_subscription(peer_jid)
             self.presence.subscribe(peer_jid)
 
@@ -53,16 +152,12 @@ class TutorAgent(Agent):
 
     class HelpResponder(behaviour.CyclicBehaviour):
         async def run(self):
-            # 🔴 VERIFICAR SE ESTÁ PARANDO
-            if self.agent.is_stopping:
-                return
-            
-            # 🔴 ESPERAR ATÉ TODOS OS AGENTES ESTAREM PRONTOS
-            if not self.agent.can_start_helping:
-                await asyncio.sleep(1)
+            # 🔴 ESPERAR ATÉ TODOS OS AGENTES ESTAREM PRONTOS (e fora de pausa)
+            if not await lifecycle.wait_started() or not await lifecycle.wait_running() or self.agent.is_stopping:
+                self.kill()
                 return
             
-            msg = await self.receive(timeout=5)
+            msg = await lifecycle.receive(self)
             if not msg:
                 return
 
@@ -71,53 +166,87 @@ class TutorAgent(Agent):
             # ---------- CFP received ----------
             if perf == "cfp":
                 random.seed()
-                parts = dict(p.split(":") for p in msg.body.split(";"))
-                student_progress = float(parts.get("progress", 0))
+                try:
+                    request = codec.decode(msg.body, codec.HelpRequest)
+                except codec.CodecError as e:
+                    self.agent.log.warning("⚠️ CFP inválido de %s: %s", msg.sender, e, color=Fore.RED)
+                    return
+                student_progress = request.progress
 
                 priority = 0
 
                 # priority = expertise * (1 - student_progress)
-                if str(parts["topic"]) == str(self.agent.discipline): 
+                if request.topic == str(self.agent.discipline): 
                     priority = 1
-                    print(Fore.RED + f"[{self.agent.name}] Priority to student {msg.sender} increased for matching discipline." + Style.RESET_ALL)
+                    self.agent.log.debug("Priority to student %s increased for matching discipline.", msg.sender, color=Fore.RED, event="priority")
                 priority += self.agent.expertise * (1 - student_progress) + random.uniform(0,0.1)
 
-                # 🔴 EVITAR DUPLICADOS: Remover pedidos anteriores do mesmo estudante
-                self.agent.queue = [(s, p) for s, p in self.agent.queue if s != str(msg.sender)]
-                
-                self.agent.queue.append((str(msg.sender), priority))
-                print(f"[{self.agent.name}] 📩 Queue: {self.agent.queue}")
-                self.agent.queue.sort(key=lambda x: x[1], reverse=True)
-
-                chosen_student = self.agent.queue.pop(0)[0]
-
+                # 🔴 EVITAR DUPLICADOS: a waitlist atualiza o pedido anterior do mesmo estudante
                 # if tutor available and this student is highest priority
-                if self.agent.available_slots > 0 and str(msg.sender) == chosen_student:
-                    proposal = Message(to=str(msg.sender))
-                    proposal.set_metadata("performative", "propose")
-                    proposal.body = f"available_in:1;discipline:{self.agent.discipline};expertise:{self.agent.expertise};slots:{self.agent.available_slots}"
-                    await self.send(proposal)
+                # (a vaga fica reservada até accept/reject ou até expirar)
+                self.agent.threads[str(msg.sender)] = msg.thread
+                if self.agent.admit(str(msg.sender), priority, clock.time()):
+                    await self.propose(str(msg.sender), msg.thread)
 
                 else:
-                    refusal = Message(to=str(msg.sender))
+                    # Recusado por agora: continua na fila e recebe uma proposta quando
+                    # ficar uma vaga livre e for o primeiro (ou no próximo CFP)
+                    self.agent.log.debug("📩 Queue: %s", self.agent.queue, event="queue")
+                    refusal = Message(to=str(msg.sender), thread=msg.thread)
                     refusal.set_metadata("performative", "refuse")
-                    refusal.body = "reject-proposal"
+                    refusal.body = codec.encode(codec.Refusal("reject-proposal"))
                     await self.send(refusal)
 
             # ---------- Acceptance ----------
             elif perf == "accept-proposal":
-                self.agent.available_slots -= 1
-                print(Fore.GREEN + f"[Tutor-{self.agent.name}] ✅ Accepted {msg.sender}" + Style.RESET_ALL)
-
-                await asyncio.sleep(2)  # simulate teaching time
+                student = str(msg.sender)
+                # Sem reserva (expirou) e sem vagas livres entretanto
+                if not self.agent.claim(student):
+                    if self.agent.available_slots <= 0:
+                        self.agent.queue.remove(student)
+                        refusal = Message(to=str(msg.sender), thread=msg.thread)
+                        refusal.set_metadata("performative", "refuse")
+                        refusal.body = codec.encode(codec.Refusal("no-slots"))
+                        await self.send(refusal)
+                        return
+                    self.agent.available_slots -= 1
+                self.agent.log.info("✅ Accepted %s", msg.sender, color=Fore.GREEN, event="accept")
+
+                # Cada sessão corre na sua própria task: o responder continua a
+                # atender CFPs e rejeições enquanto ensina (até `capacity` em paralelo)
+                session = asyncio.create_task(self.teach(str(msg.sender), msg.thread))
+                self.agent.sessions.add(session)
+                session.add_done_callback(self.agent.sessions.discard)
 
-                rsp = Message(to=str(msg.sender))
+            # ---------- Rejection ----------
+            elif perf == "reject-proposal":
+                self.agent.queue.remove(str(msg.sender))
+                self.agent.log.info("❌ Rejecterd by %s", msg.sender, color=Fore.RED, event="reject")
+                if self.agent.release(str(msg.sender)):
+                    await self.offer()
+
+        async def propose(self, student, thread):
+            proposal = Message(to=student, thread=thread)
+            proposal.set_metadata("performative", "propose")
+            proposal.body = codec.encode(codec.Proposal(self.agent.discipline, self.agent.expertise, self.agent.available_slots + 1))
+            await self.send(proposal)
+
+        async def offer(self):
+            """Oferece as vagas livres aos estudantes à espera, por ordem de prioridade."""
+            while not self.agent.is_stopping:
+                student = self.agent.next_offer(clock.time())
+                if student is None:
+                    return
+                await self.propose(student, self.agent.threads.get(student))
+
+        async def teach(self, student, thread):
+            try:
+                await clock.sleep(self.agent.teaching_time)  # simulate teaching time
+
+                rsp = Message(to=student, thread=thread)
                 rsp.set_metadata("performative", "inform")
-                rsp.body = "explicacao:Feito!"
+                rsp.body = codec.encode(codec.Explanation("Feito!"))
                 await self.send(rsp)
-
+            finally:
                 self.agent.available_slots += 1
-
-            # ---------- Rejection ----------
-            elif perf == "reject-proposal":
-                print(Fore.RED + f"[Tutor-{self.agent.name}] ❌ Rejecterd by {msg.sender}" + Style.RESET_ALL)
+            await self.offer()
@@ -0,0 +1,107 @@
+"""
+waitlist.py - Fila de prioridade de espera dos tutores.
+
+Heap com índice por JID do estudante: inserção/atualização em O(log n),
+remoção preguiçosa (as entradas antigas ficam no heap marcadas como inválidas)
+e envelhecimento da prioridade para que estudantes à espera há muito subam.
+
+Com envelhecimento linear a prioridade efetiva é
+    prioridade + aging_rate * (agora - entrada)
+e a ordem entre entradas não muda com o tempo, por isso a chave do heap
+(prioridade - aging_rate * entrada) é fixa.
+"""
+import heapq
+import itertools
+
+
+class WaitlistEntry:
+    __slots__ = ("student", "priority", "enqueued_at", "last_seen", "valid")
+
+    def __init__(self, student, priority, enqueued_at, last_seen):
+        self.student = student
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.last_seen = last_seen
+        self.valid = True
+
+
+class TutorWaitlist:
+    def __init__(self, aging_rate=0.05, ttl=3.0):
+        self.aging_rate = aging_rate
+        # Entradas não renovadas (novo CFP) há mais de `ttl` segundos expiram
+        self.ttl = ttl
+        self._heap = []  # (chave, seq, entry)
+        self._index = {}  # student -> entry válida
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, student):
+        return student in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __repr__(self):
+        top = heapq.nsmallest(3, (item for item in self._heap if item[2].valid))
+        shown = ", ".join(f"({e.student}, {e.priority:.2f})" for _, _, e in top)
+        more = f", +{len(self) - len(top)}" if len(self) > len(top) else ""
+        return f"[{shown}{more}]"
+
+    def effective_priority(self, entry, now):
+        return entry.priority + self.aging_rate * (now - entry.enqueued_at)
+
+    def push(self, student, priority, now):
+        """Insere ou atualiza o pedido do estudante (mantém a antiguidade)."""
+        old = self._index.get(student)
+        enqueued_at = now
+        if old is not None:
+            old.valid = False
+            enqueued_at = old.enqueued_at
+        entry = WaitlistEntry(student, priority, enqueued_at, now)
+        self._index[student] = entry
+        key = -(priority - self.aging_rate * enqueued_at)
+        heapq.heappush(self._heap, (key, next(self._seq), entry))
+        if len(self._heap) > 2 * len(self._index) + 16:
+            self._compact()
+        return entry
+
+    def remove(self, student):
+        entry = self._index.pop(student, None)
+        if entry is not None:
+            entry.valid = False
+
+    def peek(self, now):
+        """Estudante com maior prioridade efetiva (ou None)."""
+        while self._heap:
+            entry = self._heap[0][2]
+            if entry.valid and now - entry.last_seen <= self.ttl:
+                return entry.student
+            heapq.heappop(self._heap)
+            if entry.valid:
+                # Expirou: o estudante deixou de pedir ajuda
+                entry.valid = False
+                del self._index[entry.student]
+        return None
+
+    def pop(self, now):
+        student = self.peek(now)
+        if student is not None:
+            self.remove(student)
+        return student
+
+    def wait_times(self, now):
+        return {student: now - entry.enqueued_at for student, entry in self._index.items()}
+
+    def stats(self, now):
+        waits = [now - entry.enqueued_at for entry in self._index.values()]
+        return {
+            "depth": len(waits),
+            "max_wait": max(waits, default=0.0),
+            "mean_wait": sum(waits) / len(waits) if waits else 0.0,
+        }
+
+    def _compact(self):
+        self._heap = [item for item in self._heap if item[2].valid]
+        heapq.heapify(self._heap)